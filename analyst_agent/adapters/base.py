@@ -5,7 +5,7 @@ Defines the protocol that all data source connectors must implement
 to provide a consistent interface for the analysis engine.
 """
 
-from typing import Protocol, Any, Dict, List, Optional, runtime_checkable
+from typing import Protocol, Any, Dict, Iterable, List, Optional, runtime_checkable
 import pyarrow as pa
 
 
@@ -22,12 +22,20 @@ class Connector(Protocol):
     kind: str  # "sql" | "nosql" | "file"
     dialect: Optional[str]  # e.g., "postgres", "bigquery", "snowflake", etc.
 
-    def list_tables(self, schema: Optional[str] = None) -> List[str]:
+    def list_tables(
+        self,
+        schema: Optional[str] = None,
+        limit: Optional[int] = None,
+        names: Optional[Iterable[str]] = None
+    ) -> List[str]:
         """
         List available tables in the data source.
         
         Args:
             schema: Optional schema name to filter tables
+            limit: Optional cap on the number of names returned (first by name)
+            names: Optional lowercase names; only tables whose lowercased
+                name is one of them are returned
             
         Returns:
             List of table names
@@ -184,6 +192,25 @@ class BaseConnector:
             "check_constraints": [],
         }
 
+    def schema_version(self) -> Optional[str]:
+        """
+        Return a token that changes whenever the schema's DDL changes.
+        
+        Callers use it to invalidate cached schema metadata; None (the
+        default) means the version is unknown and only time-based expiry
+        applies.
+        """
+        return None
+
+    def count_tables(self, schema: Optional[str] = None) -> Optional[int]:
+        """
+        Return the number of tables in the schema.
+        
+        None (the default) means the count is unknown; callers fall back to
+        the length of whatever listing they hold.
+        """
+        return None
+
     def limit_clause(self, n: int) -> str:
         """Default LIMIT clause implementation."""
         if self.dialect in ("mssql",):
@@ -5,12 +5,13 @@ Provides connectivity to various SQL databases (PostgreSQL, MySQL, SQLite, etc.)
 using SQLAlchemy as the underlying driver abstraction layer.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+import threading
 import time
 import pandas as pd
 import pyarrow as pa
 import uuid
-from sqlalchemy import create_engine, text, inspect, MetaData, Table, Column
+from sqlalchemy import bindparam, create_engine, text, inspect, MetaData, Table, Column
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
 import structlog
@@ -20,6 +21,47 @@ from .registry import register
 
 logger = structlog.get_logger(__name__)
 
+# Dialects with a cheap catalogue query whose result changes with the DDL.
+# Postgres aggregates row counts and transaction ids of the schema's
+# pg_class/pg_attribute rows, which any CREATE/ALTER/DROP rewrites; DuckDB
+# is in-process, so digesting its column definitions costs no round-trip.
+_SCHEMA_VERSION_SQL: Dict[str, str] = {
+    "postgres": """
+    SELECT count(DISTINCT c.oid) || ':' || count(a.attnum) || ':' || coalesce(
+        max(greatest(c.xmin::text::bigint, a.xmin::text::bigint)), 0
+    )
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0
+    WHERE n.nspname = coalesce(:schema, current_schema())
+      AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+    """,
+    "duckdb": """
+    SELECT md5(coalesce(string_agg(
+        table_name || '.' || column_name || ':' || data_type, ','
+        ORDER BY table_name, ordinal_position
+    ), ''))
+    FROM information_schema.columns
+    WHERE table_schema = coalesce(:schema, current_schema())
+    """,
+}
+
+# Schema versions are reused for this long per (url, schema), so a burst of
+# jobs against one database probes the catalogue once
+_SCHEMA_VERSION_TTL_SECONDS = 30.0
+_schema_versions: Dict[Tuple[str, Optional[str]], Tuple[float, Optional[str]]] = {}
+_schema_versions_lock = threading.Lock()
+
+# Default-schema expression per dialect for listing tables straight from
+# information_schema, so a row cap can be applied server-side. Snowflake is
+# left to the inspector, which normalizes its upper-case identifiers.
+_CURRENT_SCHEMA_SQL: Dict[str, str] = {
+    "postgres": "current_schema()",
+    "duckdb": "current_schema()",
+    "mysql": "database()",
+    "mssql": "schema_name()",
+}
+
 
 class SQLAlchemyConnector(BaseConnector):
     """
@@ -84,16 +126,56 @@ class SQLAlchemyConnector(BaseConnector):
             logger.error("Failed to create SQLAlchemy engine", error=str(e))
             raise
     
-    def list_tables(self, schema: Optional[str] = None) -> List[str]:
-        """List available tables in the database."""
+    def list_tables(
+        self,
+        schema: Optional[str] = None,
+        limit: Optional[int] = None,
+        names: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """
+        List available tables in the database.
+        
+        With a ``limit`` or ``names`` on dialects that expose
+        information_schema, the filtering is done by the server so huge
+        catalogues are never transferred; other dialects list through the
+        inspector and filter locally.
+        """
         self._check_closed()
         
         target_schema = schema or self.schema
+        current_schema_sql = _CURRENT_SCHEMA_SQL.get(self.dialect)
+        wanted = None if names is None else sorted({name.lower() for name in names})
+        if wanted is not None and not wanted:
+            return []
         
         try:
             with self.engine.connect() as conn:
-                inspector = inspect(conn)
-                tables = inspector.get_table_names(schema=target_schema)
+                if (limit is not None or wanted is not None) and current_schema_sql is not None:
+                    limit_clause = self.limit_clause(limit) if limit is not None else ""
+                    top, trailing_limit = (limit_clause, "") if self.dialect == "mssql" else ("", limit_clause)
+                    name_filter = "AND lower(table_name) IN :names" if wanted is not None else ""
+                    sql = text(f"""
+                    SELECT {top} table_name
+                    FROM information_schema.tables
+                    WHERE table_schema = coalesce(:schema, {current_schema_sql})
+                      AND table_type = 'BASE TABLE'
+                      {name_filter}
+                    ORDER BY table_name
+                    {trailing_limit}
+                    """)
+                    params: Dict[str, Any] = {"schema": target_schema}
+                    if wanted is not None:
+                        sql = sql.bindparams(bindparam("names", expanding=True))
+                        params["names"] = wanted
+                    tables = [row[0] for row in conn.execute(sql, params)]
+                else:
+                    inspector = inspect(conn)
+                    tables = inspector.get_table_names(schema=target_schema)
+                    if wanted is not None:
+                        wanted_set = set(wanted)
+                        tables = [name for name in tables if name.lower() in wanted_set]
+                    if limit is not None:
+                        tables = sorted(tables)[:limit]
                 
                 logger.debug(
                     "Listed tables",
@@ -107,6 +189,29 @@ class SQLAlchemyConnector(BaseConnector):
             logger.error("Failed to list tables", schema=target_schema, error=str(e))
             raise
     
+    def count_tables(self, schema: Optional[str] = None) -> Optional[int]:
+        """Count the tables ``list_tables`` would return without a limit."""
+        self._check_closed()
+        
+        target_schema = schema or self.schema
+        current_schema_sql = _CURRENT_SCHEMA_SQL.get(self.dialect)
+        
+        try:
+            with self.engine.connect() as conn:
+                if current_schema_sql is None:
+                    return len(inspect(conn).get_table_names(schema=target_schema))
+                sql = f"""
+                SELECT count(*)
+                FROM information_schema.tables
+                WHERE table_schema = coalesce(:schema, {current_schema_sql})
+                  AND table_type = 'BASE TABLE'
+                """
+                return int(conn.execute(text(sql), {"schema": target_schema}).scalar() or 0)
+                
+        except SQLAlchemyError as e:
+            logger.warning("Failed to count tables", schema=target_schema, error=str(e))
+            return None
+    
     def get_columns(self, table: str) -> List[Dict[str, Any]]:
         """Get column information for a table."""
         self._check_closed()
@@ -203,6 +308,33 @@ class SQLAlchemyConnector(BaseConnector):
                 "check_constraints": [],
             }
     
+    def schema_version(self) -> Optional[str]:
+        """Cheap catalogue signal that changes with the schema's DDL, or None if unsupported."""
+        sql = _SCHEMA_VERSION_SQL.get(self.dialect)
+        if sql is None:
+            return None
+        
+        self._check_closed()
+        
+        key = (str(self.url), self.schema)
+        with _schema_versions_lock:
+            cached = _schema_versions.get(key)
+        if cached is not None and time.monotonic() - cached[0] < _SCHEMA_VERSION_TTL_SECONDS:
+            return cached[1]
+        
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(text(sql), {"schema": self.schema}).fetchone()
+            version = str(row[0]) if row and row[0] is not None else None
+            
+        except SQLAlchemyError as e:
+            logger.warning("Failed to read schema version", schema=self.schema, error=str(e))
+            return None
+        
+        with _schema_versions_lock:
+            _schema_versions[key] = (time.monotonic(), version)
+        return version
+    
     def profile_counts(self, table: str, ts_col: Optional[str] = None) -> Dict[str, Any]:
         """Get basic profiling information for a table."""
         self._check_closed()
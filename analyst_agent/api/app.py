@@ -16,6 +16,7 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 import structlog
 
+from analyst_agent.logging_config import configure_logging
 from analyst_agent.settings import settings
 from analyst_agent.models.contracts import (
     AnalysisRequest,
@@ -29,6 +30,7 @@ from analyst_agent.schemas import (
 )
 
 # Configure structured logging
+configure_logging()
 logger = structlog.get_logger(__name__)
 
 # Global state for tracking application startup time
@@ -44,13 +46,18 @@ async def lifespan(app: FastAPI):
     app_start_time = time.time()
     logger.info("Starting Analyst Agent service", version=settings.app_version)
     
-    # TODO: Initialize database connections, LLM providers, etc.
+    from analyst_agent.api.job_queue import close_queue_pool, get_queue_pool, queue_enabled
+    from analyst_agent.api.job_store import get_job_store
+
+    if queue_enabled():
+        await get_queue_pool()
     
     yield
     
     # Shutdown
     logger.info("Shutting down Analyst Agent service")
-    # TODO: Clean up resources
+    await close_queue_pool()
+    await get_job_store().close()
 
 
 def create_app() -> FastAPI:
@@ -0,0 +1,77 @@
+"""
+ARQ job queue used to run background analyses in dedicated worker processes.
+
+Enabled with ``USE_JOB_QUEUE=true`` and ``REDIS_URL``. Workers are started
+separately with ``arq analyst_agent.worker.WorkerSettings``.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+import structlog
+
+from analyst_agent.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+_pool: Optional[Any] = None
+_pool_lock = asyncio.Lock()
+
+
+def queue_enabled() -> bool:
+    """Return True if background analyses should go through the ARQ queue."""
+    return bool(settings.use_job_queue and settings.redis_url)
+
+
+def redis_settings() -> Any:
+    """Build ARQ Redis settings from the configured Redis URL."""
+    from arq.connections import RedisSettings
+
+    return RedisSettings.from_dsn(settings.redis_url or "redis://localhost:6379")
+
+
+async def get_queue_pool() -> Any:
+    """
+    Get the shared ARQ connection pool (created once per process).
+    
+    Returns:
+        ArqRedis pool used for enqueueing jobs
+    """
+    global _pool
+    
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                from arq import create_pool
+
+                _pool = await create_pool(redis_settings())
+                logger.info("Connected to ARQ job queue")
+    
+    return _pool
+
+
+async def enqueue_analysis_job(
+    job_id: str,
+    spec: Dict[str, Any],
+    data_source: Dict[str, Any]
+) -> None:
+    """
+    Enqueue an analysis job for a worker process.
+    
+    Args:
+        job_id: Unique job identifier (also used as the ARQ job ID)
+        spec: JSON-mode dump of the QuerySpec
+        data_source: JSON-mode dump of the DataSource
+    """
+    pool = await get_queue_pool()
+    await pool.enqueue_job("process_analysis_job", job_id, spec, data_source, _job_id=job_id)
+    logger.info("Enqueued analysis job", job_id=job_id)
+
+
+async def close_queue_pool() -> None:
+    """Close the shared ARQ pool if it was created."""
+    global _pool
+    
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
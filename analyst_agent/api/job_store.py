@@ -0,0 +1,492 @@
+"""
+Job storage backends for tracking analysis jobs.
+
+Job records are slotted ``JobRecord`` dataclasses keyed by job ID. The in-memory backend is
+used by default; when ``REDIS_URL`` is configured, records are persisted as
+Redis hashes (``job:{job_id}``) so any API worker can serve job status, and
+every write is announced on the ``job:{job_id}:events`` Pub/Sub channel.
+"""
+
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, fields as dataclass_fields
+from datetime import datetime
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+)
+
+from cachetools import TTLCache
+import orjson
+import structlog
+
+from analyst_agent.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+# Statuses after which a job no longer changes
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+@dataclass(slots=True)
+class JobRecord:
+    """State of one analysis job as held by a job store."""
+
+    job_id: str
+    status: str
+    spec: Dict[str, Any]
+    data_source: Dict[str, Any]
+    created_at_ns: int
+    current_step: Optional[str] = None
+    execution_steps: List[Dict[str, Any]] = field(default_factory=list)
+    # RunResult when held in memory; its JSON form when read back from Redis
+    result: Any = None
+    error: Optional[str] = None
+    completed_at: Any = None
+
+
+_JOB_RECORD_FIELDS = tuple(f.name for f in dataclass_fields(JobRecord))
+
+
+class JobWatcher(Protocol):
+    """Handle for waiting on changes to a single job."""
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until the job changes; return False if ``timeout`` elapsed first."""
+        ...
+
+
+class JobStore(Protocol):
+    """Protocol for job storage backends."""
+
+    async def create(self, record: JobRecord) -> None:
+        """Store a new job record."""
+        ...
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        """Return the job record, or None if it doesn't exist."""
+        ...
+
+    async def update(self, job_id: str, ttl: Optional[int] = None, **fields: Any) -> bool:
+        """
+        Set fields on an existing, unfinished job record.
+
+        The check and the write happen atomically, so a job that was cancelled
+        (or otherwise finished) concurrently is never moved out of its terminal
+        status. If ``ttl`` is given, the record is also scheduled to expire
+        after it.
+
+        Returns:
+            True if the fields were written, False if the job is missing or
+            already in one of ``TERMINAL_STATUSES``.
+        """
+        ...
+
+    async def record_step(
+        self,
+        job_id: str,
+        execution_steps: Iterable[Dict[str, Any]],
+        current_step: str,
+        error: Optional[str] = None,
+    ) -> None:
+        """Publish step progress, keeping the first reported error."""
+        ...
+
+    async def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Atomically mark a job cancelled unless it already completed or failed.
+
+        Returns the status prior to the call, or None if the job doesn't exist.
+        """
+        ...
+
+    async def expire(self, job_id: str, ttl: int) -> None:
+        """Evict the job record after ``ttl`` seconds."""
+        ...
+
+    def watch(self, job_id: str) -> AsyncContextManager[JobWatcher]:
+        """Subscribe to change notifications for a job."""
+        ...
+
+    async def close(self) -> None:
+        """Release any backend resources."""
+        ...
+
+
+class _EventWatcher:
+    """JobWatcher backed by an asyncio.Event set on every job write."""
+
+    def __init__(self) -> None:
+        self.event = asyncio.Event()
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.event.clear()
+        return True
+
+
+class _JobCache(TTLCache):
+    """TTLCache that logs when a live job is evicted to respect ``maxsize``."""
+
+    def popitem(self) -> Tuple[str, JobRecord]:
+        job_id, job = super().popitem()
+        logger.warning(
+            "Evicted job from full in-memory job store",
+            job_id=job_id,
+            status=job.status,
+            maxsize=self.maxsize,
+        )
+        return job_id, job
+
+
+class InMemoryJobStore:
+    """
+    Process-local job store backed by a size- and time-bounded cache.
+
+    Every write refreshes a job's lifetime, so records that are never
+    finished (or never polled again) still age out after ``ttl_seconds``.
+    All access happens on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_jobs: int, ttl_seconds: int) -> None:
+        self._jobs: TTLCache = _JobCache(maxsize=max_jobs, ttl=ttl_seconds)
+        # Strong references to pending expiry tasks so they aren't garbage collected
+        self._expiry_tasks: Set[asyncio.Task] = set()
+        self._watchers: Dict[str, Set[_EventWatcher]] = {}
+
+    def _notify(self, job_id: str) -> None:
+        for watcher in self._watchers.get(job_id, ()):
+            watcher.event.set()
+
+    async def create(self, record: JobRecord) -> None:
+        self._jobs[record.job_id] = record
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        return self._jobs.get(job_id)
+
+    async def update(self, job_id: str, ttl: Optional[int] = None, **fields: Any) -> bool:
+        # No await between the status check and the write, so this is atomic
+        job = self._jobs.get(job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return False
+        for name, value in fields.items():
+            setattr(job, name, value)
+        self._jobs[job_id] = job
+        self._notify(job_id)
+        if ttl is not None:
+            await self.expire(job_id, ttl)
+        return True
+
+    async def record_step(
+        self,
+        job_id: str,
+        execution_steps: Iterable[Dict[str, Any]],
+        current_step: str,
+        error: Optional[str] = None,
+    ) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job.execution_steps = list(execution_steps)
+        job.current_step = current_step
+        if error and not job.error:
+            job.error = error
+        self._jobs[job_id] = job
+        self._notify(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[str]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        previous = job.status
+        if previous not in ("completed", "failed"):
+            job.status = "cancelled"
+            job.completed_at = datetime.utcnow()
+            self._notify(job_id)
+        return previous
+
+    async def expire(self, job_id: str, ttl: int) -> None:
+        task = asyncio.create_task(self._expire_after(job_id, ttl))
+        self._expiry_tasks.add(task)
+        task.add_done_callback(self._expiry_tasks.discard)
+
+    async def _expire_after(self, job_id: str, ttl: int) -> None:
+        await asyncio.sleep(ttl)
+        if self._jobs.pop(job_id, None) is not None:
+            self._notify(job_id)
+            logger.debug("Evicted expired job", job_id=job_id)
+
+    @asynccontextmanager
+    async def watch(self, job_id: str) -> AsyncIterator[JobWatcher]:
+        watcher = _EventWatcher()
+        self._watchers.setdefault(job_id, set()).add(watcher)
+        try:
+            yield watcher
+        finally:
+            watchers = self._watchers.get(job_id)
+            if watchers is not None:
+                watchers.discard(watcher)
+                if not watchers:
+                    del self._watchers[job_id]
+
+    async def close(self) -> None:
+        for task in list(self._expiry_tasks):
+            task.cancel()
+        self._jobs.clear()
+
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def _json_default(value: Any) -> Any:
+    """Fallback encoder for values orjson can't serialize natively."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _encode(value: Any) -> bytes:
+    return orjson.dumps(value, default=_json_default, option=_ORJSON_OPTIONS)
+
+
+_TERMINAL_STATUS_ARGS = tuple(_encode(status) for status in TERMINAL_STATUSES)
+
+
+# HSET fields only if the job hash still exists (it may have expired) and has
+# not reached a terminal status; ARGV[1..3] are the encoded terminal statuses
+_UPDATE_SCRIPT = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status then return 0 end
+if status == ARGV[1] or status == ARGV[2] or status == ARGV[3] then return 0 end
+redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+return 1
+"""
+
+# Step progress update that never overwrites an earlier error
+_RECORD_STEP_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], 'execution_steps', ARGV[1], 'current_step', ARGV[2])
+if ARGV[3] ~= '' then
+    local current = redis.call('HGET', KEYS[1], 'error')
+    if not current or current == 'null' then
+        redis.call('HSET', KEYS[1], 'error', ARGV[3])
+    end
+end
+return 1
+"""
+
+# Compare-and-swap cancel: returns the previous status, or nil if missing
+_CANCEL_SCRIPT = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status then return nil end
+if status ~= ARGV[1] and status ~= ARGV[2] then
+    redis.call('HSET', KEYS[1], 'status', ARGV[3], 'completed_at', ARGV[4])
+    redis.call('PUBLISH', KEYS[2], ARGV[5])
+end
+return status
+"""
+
+
+class _PubSubWatcher:
+    """JobWatcher backed by a subscription to the job's events channel."""
+
+    def __init__(self, pubsub: Any) -> None:
+        self._pubsub = pubsub
+
+    async def wait(self, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            message = await self._pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=remaining
+            )
+            if message is not None:
+                return True
+
+
+class RedisJobStore:
+    """
+    Job store persisting each job as a Redis hash of JSON-encoded fields.
+
+    Step progress is coalesced per job and flushed in a single pipelined
+    round trip every ``step_flush_interval`` seconds, or together with the
+    next ``update`` for that job.
+    """
+
+    key_prefix = "job:"
+
+    def __init__(self, url: str, ttl_seconds: int, step_flush_interval: float = 0.25) -> None:
+        import redis.asyncio as redis
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._ttl_seconds = ttl_seconds
+        self._step_flush_interval = step_flush_interval
+        # job_id -> (execution_steps, current_step, first_error) awaiting flush
+        self._pending_steps: Dict[str, Tuple[List[Dict[str, Any]], str, Optional[str]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._update = self._redis.register_script(_UPDATE_SCRIPT)
+        self._record_step = self._redis.register_script(_RECORD_STEP_SCRIPT)
+        self._cancel = self._redis.register_script(_CANCEL_SCRIPT)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.key_prefix}{job_id}"
+
+    def _channel(self, job_id: str) -> str:
+        return f"{self.key_prefix}{job_id}:events"
+
+    async def create(self, record: JobRecord) -> None:
+        key = self._key(record.job_id)
+        mapping = {name: _encode(getattr(record, name)) for name in _JOB_RECORD_FIELDS}
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            # Bound the lifetime of jobs whose worker dies before finishing
+            pipe.expire(key, self._ttl_seconds)
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        raw = await self._redis.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        values = {k: orjson.loads(v) for k, v in raw.items() if k in _JOB_RECORD_FIELDS}
+        # Status and step labels come from a small fixed set; share one copy
+        for name in ("status", "current_step"):
+            if isinstance(values.get(name), str):
+                values[name] = sys.intern(values[name])
+        return JobRecord(**values)
+
+    async def update(self, job_id: str, ttl: Optional[int] = None, **fields: Any) -> bool:
+        pending = self._pending_steps.pop(job_id, None)
+        if not fields and pending is None and ttl is None:
+            return True
+        key = self._key(job_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            if pending is not None:
+                await self._queue_step(pipe, job_id, pending)
+            if fields:
+                args = list(_TERMINAL_STATUS_ARGS)
+                for name, value in fields.items():
+                    args.extend((name, _encode(value)))
+                await self._update(keys=[key], args=args, client=pipe)
+            if ttl is not None:
+                pipe.expire(key, ttl)
+            pipe.publish(
+                self._channel(job_id),
+                _encode({"job_id": job_id, "status": fields.get("status"), "fields": list(fields)}),
+            )
+            results = await pipe.execute()
+        if not fields:
+            return True
+        # A queued step occupies the first two pipeline slots (script + publish)
+        return bool(results[2 if pending is not None else 0])
+
+    async def record_step(
+        self,
+        job_id: str,
+        execution_steps: Iterable[Dict[str, Any]],
+        current_step: str,
+        error: Optional[str] = None,
+    ) -> None:
+        pending = self._pending_steps.get(job_id)
+        first_error = pending[2] if pending is not None and pending[2] else error
+        self._pending_steps[job_id] = (list(execution_steps), current_step, first_error)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_steps_later())
+
+    async def _flush_steps_later(self) -> None:
+        await asyncio.sleep(self._step_flush_interval)
+        await self.flush_steps()
+
+    async def flush_steps(self) -> None:
+        """Write all coalesced step progress in one pipelined round trip."""
+        pending, self._pending_steps = self._pending_steps, {}
+        if not pending:
+            return
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for job_id, entry in pending.items():
+                await self._queue_step(pipe, job_id, entry)
+            await pipe.execute()
+
+    async def _queue_step(
+        self,
+        pipe: Any,
+        job_id: str,
+        entry: Tuple[List[Dict[str, Any]], str, Optional[str]],
+    ) -> None:
+        execution_steps, current_step, error = entry
+        await self._record_step(
+            keys=[self._key(job_id)],
+            args=[
+                _encode(execution_steps),
+                _encode(current_step),
+                _encode(error) if error else "",
+            ],
+            client=pipe,
+        )
+        pipe.publish(
+            self._channel(job_id),
+            _encode({"job_id": job_id, "current_step": current_step}),
+        )
+
+    async def cancel(self, job_id: str) -> Optional[str]:
+        previous = await self._cancel(
+            keys=[self._key(job_id), self._channel(job_id)],
+            args=[
+                _encode("completed"),
+                _encode("failed"),
+                _encode("cancelled"),
+                _encode(datetime.utcnow()),
+                _encode({"job_id": job_id, "status": "cancelled"}),
+            ],
+        )
+        return orjson.loads(previous) if previous is not None else None
+
+    async def expire(self, job_id: str, ttl: int) -> None:
+        await self._redis.expire(self._key(job_id), ttl)
+
+    @asynccontextmanager
+    async def watch(self, job_id: str) -> AsyncIterator[JobWatcher]:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self._channel(job_id))
+        try:
+            yield _PubSubWatcher(pubsub)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        await self.flush_steps()
+        await self._redis.aclose()
+
+
+@lru_cache(maxsize=1)
+def get_job_store() -> JobStore:
+    """
+    Get the configured job store (created once per process).
+
+    Returns:
+        RedisJobStore if ``settings.redis_url`` is set, otherwise InMemoryJobStore
+    """
+    if settings.redis_url:
+        logger.info("Using Redis job store")
+        return RedisJobStore(settings.redis_url, settings.job_ttl_seconds)
+    return InMemoryJobStore(settings.max_jobs, settings.job_ttl_seconds)
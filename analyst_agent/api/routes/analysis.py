@@ -8,10 +8,14 @@ database dialects and async workflow execution.
 import uuid
 import asyncio
 import json
+import math
+import random
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Coroutine, Optional, Set
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import structlog
 from urllib.parse import quote_plus
 
@@ -29,6 +33,8 @@ from analyst_agent.models.contracts import (
     ExecutionStep
 )
 from analyst_agent.adapters import make_connector
+from analyst_agent.api.job_queue import enqueue_analysis_job, queue_enabled
+from analyst_agent.api.job_store import TERMINAL_STATUSES, JobRecord, JobStore, get_job_store
 from analyst_agent.core.graph import run_analysis_async
 from analyst_agent.core.state import add_execution_step as _add_execution_step
 from analyst_agent.settings import settings
@@ -55,22 +61,17 @@ def streaming_add_execution_step(
     
     # Update job store for streaming
     job_id = state.get("job_id")
-    if job_id and job_id in job_store:
-        # Get the latest step
-        execution_steps = state.get("execution_steps", [])
-        if execution_steps:
-            latest_step = execution_steps[-1]
-            
-            # Update job store with streaming-friendly data
-            if "execution_steps" not in job_store[job_id]:
-                job_store[job_id]["execution_steps"] = []
-            
-            job_store[job_id]["execution_steps"] = execution_steps
-            job_store[job_id]["current_step"] = step_name
-            
-            # Update overall job status
-            if status == "failed" and not job_store[job_id].get("error"):
-                job_store[job_id]["error"] = error
+    execution_steps = state.get("execution_steps", [])
+    if job_id and execution_steps:
+        _submit_to_loop(
+            job_store.record_step(
+                job_id,
+                # Snapshot so later appends don't race the (deferred) write
+                list(execution_steps),
+                step_name,
+                error if status == "failed" else None,
+            )
+        )
     
     return result
 
@@ -82,10 +83,76 @@ try:
 except ImportError:
     logger.warning("Could not import nodes module for streaming patch")
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+try:
+    # Rust-backed, time-ordered UUIDs (k-sorted job IDs give better key locality)
+    from uuid_utils import uuid7 as _new_uuid
+except ImportError:  # pragma: no cover - optional speedup
+    _new_uuid = uuid.uuid4
+
+
+def new_job_id() -> str:
+    """Generate a unique job identifier."""
+    return str(_new_uuid())
+
+# Job store shared by all routes (Redis-backed when REDIS_URL is configured)
+job_store: JobStore = get_job_store()
+
+# Event loop serving job requests; workflow nodes may run in executor threads
+_main_loop: Optional[asyncio.AbstractEventLoop] = None
+_pending_writes: Set[asyncio.Task] = set()
+
+# Bounds concurrent analyses so bursts wait here instead of exhausting LLM
+# rate limits and database connections
+_analysis_slots = asyncio.Semaphore(settings.max_concurrent_analyses)
+_analyses_running = 0
+_analyses_waiting = 0
+
+
+@asynccontextmanager
+async def _analysis_slot() -> AsyncIterator[None]:
+    """Hold one of the ``max_concurrent_analyses`` slots, tracking queue depth."""
+    global _analyses_running, _analyses_waiting
+    
+    _analyses_waiting += 1
+    try:
+        await _analysis_slots.acquire()
+    finally:
+        _analyses_waiting -= 1
+    
+    _analyses_running += 1
+    try:
+        yield
+    finally:
+        _analyses_running -= 1
+        _analysis_slots.release()
+
+
+def analysis_queue_stats() -> Dict[str, int]:
+    """Return the number of analyses running and waiting for a slot in this process."""
+    return {
+        "running": _analyses_running,
+        "waiting": _analyses_waiting,
+        "limit": settings.max_concurrent_analyses,
+    }
+
 
-# In-memory job store (replace with Redis/database in production)
-job_store: Dict[str, Dict[str, Any]] = {}
+def _submit_to_loop(coro: Coroutine[Any, Any, Any]) -> None:
+    """Schedule a job-store write from synchronous workflow code without blocking."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    
+    if loop is not None:
+        task = loop.create_task(coro)
+        _pending_writes.add(task)
+        task.add_done_callback(_pending_writes.discard)
+    elif _main_loop is not None and not _main_loop.is_closed():
+        asyncio.run_coroutine_threadsafe(coro, _main_loop)
+    else:
+        coro.close()
 
 
 def construct_database_url(kind: str, config: Dict[str, Any]) -> str:
@@ -152,45 +219,46 @@ def construct_database_url(kind: str, config: Dict[str, Any]) -> str:
         return f"{kind}://{credentials}{host}{port_str}/{database}"
 
 
-async def process_analysis_job(job_id: str, spec: QuerySpec, data_source: DataSource) -> None:
+async def _run_inline(job_id: str, spec: QuerySpec, data_source: DataSource) -> RunResult:
     """
-    Background task to process analysis jobs using the LangGraph workflow.
+    Run an analysis job to completion and return its result directly.
+    
+    Does not touch ``job_store``; callers that need job tracking wrap this
+    (see ``process_analysis_job``).
     
     Args:
         job_id: Unique job identifier
         spec: Query specification
         data_source: Data source configuration
+        
+    Returns:
+        Formatted RunResult
     """
-    logger.info("Starting analysis job", job_id=job_id)
-    
-    job_store[job_id]["status"] = "running"
-    job_store[job_id]["current_step"] = "initializing"
+    # Create connector with URL construction if needed
+    config = dict(data_source.config)
+    original_host = config.get("host")
+    supabase_url_config = config.get("supabase_url")
+    rls_context = data_source.rls_auth
+    
+    # If no URL provided but individual connection params are available, construct URL
+    if 'url' not in config and all(key in config for key in ['host', 'database', 'user']):
+        url = construct_database_url(data_source.kind, config)
+        config['url'] = url
+        # Remove individual parameters that are now in the URL
+        for key in ['host', 'database', 'user', 'password', 'port']:
+            config.pop(key, None)
+
+    # Remove non-engine kwargs that were used for Supabase context
+    supabase_url_config = config.pop("supabase_url", supabase_url_config)
+    original_host = config.pop("host", original_host)
+    
+    connector = make_connector(
+        kind=data_source.kind,
+        **config,
+        business_tz=data_source.business_tz
+    )
     
     try:
-        # Create connector with URL construction if needed
-        config = dict(data_source.config)
-        original_host = config.get("host")
-        supabase_url_config = config.get("supabase_url")
-        rls_context = data_source.rls_auth
-        
-        # If no URL provided but individual connection params are available, construct URL
-        if 'url' not in config and all(key in config for key in ['host', 'database', 'user']):
-            url = construct_database_url(data_source.kind, config)
-            config['url'] = url
-            # Remove individual parameters that are now in the URL
-            for key in ['host', 'database', 'user', 'password', 'port']:
-                config.pop(key, None)
-
-        # Remove non-engine kwargs that were used for Supabase context
-        supabase_url_config = config.pop("supabase_url", supabase_url_config)
-        original_host = config.pop("host", original_host)
-        
-        connector = make_connector(
-            kind=data_source.kind,
-            **config,
-            business_tz=data_source.business_tz
-        )
-        
         # Set up execution context
         ctx = {
             "connector": connector,
@@ -219,9 +287,6 @@ async def process_analysis_job(job_id: str, spec: QuerySpec, data_source: DataSo
         if project_ref:
             ctx["supabase_project_ref"] = project_ref
         
-        # Update job status
-        job_store[job_id]["current_step"] = "running_analysis"
-        
         # Run the analysis workflow
         final_state = await run_analysis_async(
             job_id=job_id,
@@ -229,31 +294,79 @@ async def process_analysis_job(job_id: str, spec: QuerySpec, data_source: DataSo
             ctx=ctx,
             rls_context=rls_context
         )
-        
-        # Convert state to RunResult
-        result = state_to_run_result(job_id, final_state)
-        
-        # Store result
-        job_store[job_id]["status"] = "completed"
-        job_store[job_id]["result"] = result
-        job_store[job_id]["completed_at"] = datetime.utcnow()
-        
-        # Close connector
+    finally:
         connector.close()
+    
+    logger.info(
+        "Analysis job completed",
+        job_id=job_id,
+        quality_score=final_state.get("quality", {}).get("score", 0)
+    )
+    
+    # Convert state to RunResult
+    return state_to_run_result(job_id, final_state)
+
+
+async def process_analysis_job(job_id: str, spec: QuerySpec, data_source: DataSource) -> None:
+    """
+    Background task to process analysis jobs using the LangGraph workflow.
+    
+    At most ``settings.max_concurrent_analyses`` jobs run at once per process;
+    the rest stay pending until a slot frees up.
+    
+    Args:
+        job_id: Unique job identifier
+        spec: Query specification
+        data_source: Data source configuration
+    """
+    global _main_loop
+    _main_loop = asyncio.get_running_loop()
+    
+    async with _analysis_slot():
+        logger.info("Starting analysis job", job_id=job_id)
         
-        logger.info(
-            "Analysis job completed",
-            job_id=job_id,
-            quality_score=final_state.get("quality", {}).get("score", 0)
-        )
-        
-    except Exception as e:
-        error_msg = str(e)
-        logger.error("Analysis job failed", job_id=job_id, error=error_msg)
+        if not await job_store.update(job_id, status="running", current_step="running_analysis"):
+            # Cancelled (or expired) while still queued
+            logger.info("Skipping analysis job that is no longer pending", job_id=job_id)
+            return
         
-        job_store[job_id]["status"] = "failed"
-        job_store[job_id]["error"] = error_msg
-        job_store[job_id]["completed_at"] = datetime.utcnow()
+        try:
+            result = await _run_inline(job_id, spec, data_source)
+            
+            # Store result; a no-op if the job was cancelled while running
+            stored = await job_store.update(
+                job_id,
+                ttl=settings.job_ttl_seconds,
+                status="completed",
+                result=result,
+                completed_at=datetime.utcnow()
+            )
+            if not stored:
+                logger.info("Discarding result of cancelled analysis job", job_id=job_id)
+            
+        except asyncio.CancelledError:
+            # Raised when the worker's job timeout fires; record the failure so
+            # pollers and stream clients don't wait on a "running" job forever
+            logger.error("Analysis job cancelled", job_id=job_id)
+            await asyncio.shield(job_store.update(
+                job_id,
+                ttl=settings.job_ttl_seconds,
+                status="failed",
+                error="Analysis timed out",
+                completed_at=datetime.utcnow()
+            ))
+            raise
+        except Exception as e:
+            error_msg = str(e)
+            logger.error("Analysis job failed", job_id=job_id, error=error_msg)
+            
+            await job_store.update(
+                job_id,
+                ttl=settings.job_ttl_seconds,
+                status="failed",
+                error=error_msg,
+                completed_at=datetime.utcnow()
+            )
 
 
 def state_to_run_result(job_id: str, state: Dict[str, Any]) -> RunResult:
@@ -267,9 +380,18 @@ def state_to_run_result(job_id: str, state: Dict[str, Any]) -> RunResult:
     Returns:
         Formatted RunResult
     """
-    # Convert artifacts
-    artifacts = []
+    # Convert artifacts, partitioning tables and charts in a single pass
+    tables = []
+    charts = []
     for artifact in state.get("artifacts", []):
+        kind = artifact["kind"]
+        if kind == "table":
+            bucket = tables
+        elif kind == "chart":
+            bucket = charts
+        else:
+            continue
+
         # Ensure artifact content is JSON-serializable (e.g., dtypes)
         content = artifact.get("content")
         if isinstance(content, dict):
@@ -278,9 +400,9 @@ def state_to_run_result(job_id: str, state: Dict[str, Any]) -> RunResult:
                 # Convert any non-JSON-serializable dtype objects to strings
                 summary["dtypes"] = {k: str(v) for k, v in summary["dtypes"].items()}
                 content["summary"] = summary
-        artifacts.append(Artifact(
+        bucket.append(Artifact(
             id=artifact["id"],
-            kind=artifact["kind"],
+            kind=kind,
             title=artifact["title"],
             meta=artifact.get("meta", {}),
             content=content,
@@ -322,10 +444,6 @@ def state_to_run_result(job_id: str, state: Dict[str, Any]) -> RunResult:
             metadata=step.get("metadata", {})
         ))
     
-    # Separate artifacts by type
-    tables = [a for a in artifacts if a.kind == "table"]
-    charts = [a for a in artifacts if a.kind == "chart"]
-    
     # Handle datetime fields that might be strings or datetime objects
     created_at = state.get("created_at", datetime.utcnow())
     if isinstance(created_at, str):
@@ -366,7 +484,7 @@ async def run_query(
     This endpoint creates a new analysis job and returns the results
     directly (for synchronous execution) or job information (for async).
     """
-    job_id = str(uuid.uuid4())
+    job_id = new_job_id()
     
     logger.info(
         "Received analysis request",
@@ -385,98 +503,135 @@ async def run_query(
             detail=f"Unsupported dialect: {spec.dialect}"
         )
     
-    # Initialize job tracking
-    job_store[job_id] = {
-        "job_id": job_id,
-        "status": "pending",
-        "spec": spec.model_dump(),
-        "data_source": data_source.model_dump(exclude={"rls_auth"}),
-        "created_at": datetime.utcnow(),
-        "current_step": None,
-        "result": None,
-        "error": None
-    }
-    
-    # For small queries, run synchronously
+    # For small queries, run synchronously without job tracking
     if spec.validation_profile.value == "fast":
         try:
-            await process_analysis_job(job_id, spec, data_source)
-            
-            if job_store[job_id]["status"] == "completed":
-                return job_store[job_id]["result"]
-            else:
-                error = job_store[job_id].get("error", "Unknown error")
-                raise HTTPException(status_code=500, detail=f"Analysis failed: {error}")
-                
-        except HTTPException:
-            raise
+            async with _analysis_slot():
+                return await _run_inline(job_id, spec, data_source)
         except Exception as e:
             logger.error("Synchronous analysis failed", job_id=job_id, error=str(e))
             raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
     
-    # For larger queries, run asynchronously
+    # For larger queries, track the job and run it in the background
+    created_at_ns = time.time_ns()
+    await job_store.create(JobRecord(
+        job_id=job_id,
+        status="pending",
+        spec=spec.model_dump(),
+        data_source=data_source.model_dump(exclude={"rls_auth"}),
+        created_at_ns=created_at_ns
+    ))
+    
+    if queue_enabled():
+        await enqueue_analysis_job(
+            job_id,
+            spec.model_dump(mode="json"),
+            data_source.model_dump(mode="json")
+        )
     else:
         background_tasks.add_task(process_analysis_job, job_id, spec, data_source)
+    
+    # Return partial result with job tracking info
+    return RunResult(
+        job_id=job_id,
+        answer="Analysis is running. Check job status for updates.",
+        tables=[],
+        charts=[],
+        quality=QualityReport(
+            passed=False,
+            score=0.0,
+            gates=[],
+            notes=["Analysis in progress"],
+            reconciliation={},
+            plateau=False
+        ),
+        lineage={"status": "running"},
+        execution_steps=[],
+        created_at=datetime.utcfromtimestamp(created_at_ns / 1e9),
+        completed_at=None
+    )
+
+
+def compute_poll_delay(job: JobRecord) -> Optional[float]:
+    """
+    Suggest how long a client should wait before polling a job again.
+    
+    Uses exponential backoff on the job's age (doubling every 5 seconds,
+    between 1 and 30 seconds) plus up to 1 second of jitter so clients
+    polling many jobs don't synchronize.
+    
+    Args:
+        job: Job record from the job store
         
-        # Return partial result with job tracking info
-        return RunResult(
-            job_id=job_id,
-            answer="Analysis is running. Check job status for updates.",
-            tables=[],
-            charts=[],
-            quality=QualityReport(
-                passed=False,
-                score=0.0,
-                gates=[],
-                notes=["Analysis in progress"],
-                reconciliation={},
-                plateau=False
-            ),
-            lineage={"status": "running"},
-            execution_steps=[],
-            created_at=datetime.utcnow(),
-            completed_at=None
-        )
+    Returns:
+        Delay in seconds, or None if the job is finished
+    """
+    if job.status in TERMINAL_STATUSES:
+        return None
+    
+    created_at_ns = job.created_at_ns
+    elapsed = (time.time_ns() - created_at_ns) / 1e9 if created_at_ns else 0.0
+    base = min(30, max(1, 2 ** min(int(elapsed // 5), 5)))
+    return base + random.uniform(0, 1)
 
 
 @router.get("/jobs/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str) -> JobStatusResponse:
+async def get_job_status(job_id: str) -> ORJSONResponse:
     """
     Get the status of an analysis job.
     
+    While the job is running, the response carries a ``Retry-After`` header
+    and ``retry_after_ms`` field telling the client when to poll next.
+    
+    Job store contents are written only by this service (``run_query`` and
+    ``process_analysis_job``) from already-validated models, so the response
+    is built with ``model_construct`` and serialized directly instead of being
+    re-validated on every poll.
+    
     Args:
         job_id: Unique job identifier
         
     Returns:
         Job status information
     """
-    if job_id not in job_store:
+    job = await job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = job_store[job_id]
+    headers = {"Cache-Control": "no-store"}
+    retry_after = compute_poll_delay(job)
+    if retry_after is not None:
+        headers["Retry-After"] = str(math.ceil(retry_after))
     
     # Calculate progress based on status
     progress = None
-    if job["status"] == "pending":
+    if job.status == "pending":
         progress = 0.0
-    elif job["status"] == "running":
+    elif job.status == "running":
         progress = 0.5  # Rough estimate
-    elif job["status"] in ["completed", "failed"]:
+    elif job.status in ["completed", "failed"]:
         progress = 1.0
     
-    return JobStatusResponse(
+    status_response = JobStatusResponse.model_construct(
         job_id=job_id,
-        status=job["status"],
+        status=job.status,
         progress=progress,
-        current_step=job.get("current_step"),
+        current_step=job.current_step,
         estimated_completion=None,  # Could implement time estimation
-        result=job.get("result"),
-        error=job.get("error")
+        result=job.result,
+        error=job.error,
+        retry_after_ms=int(retry_after * 1000) if retry_after is not None else None
+    )
+    # The Redis store hands back ``result`` as an already-serialized dict
+    # rather than a RunResult, hence warnings=False.
+    return ORJSONResponse(
+        content=status_response.model_dump(mode="json", warnings=False),
+        headers=headers
     )
 
 
 @router.delete("/jobs/{job_id}")
-async def cancel_job(job_id: str) -> JSONResponse:
+async def cancel_job(job_id: str) -> ORJSONResponse:
     """
     Cancel a running analysis job.
     
@@ -486,41 +641,42 @@ async def cancel_job(job_id: str) -> JSONResponse:
     Returns:
         Cancellation status
     """
-    if job_id not in job_store:
+    previous_status = await job_store.cancel(job_id)
+    if previous_status is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = job_store[job_id]
-    
-    if job["status"] in ["completed", "failed"]:
-        return JSONResponse(
-            content={"message": f"Job {job_id} already {job['status']}"},
+    if previous_status in ["completed", "failed"]:
+        return ORJSONResponse(
+            content={"message": f"Job {job_id} already {previous_status}"},
             status_code=200
         )
     
-    # Mark as cancelled (actual cancellation would require more complex logic)
-    job["status"] = "cancelled"
-    job["completed_at"] = datetime.utcnow()
+    await job_store.expire(job_id, settings.job_ttl_seconds)
     
     logger.info("Job cancelled", job_id=job_id)
     
-    return JSONResponse(
+    return ORJSONResponse(
         content={"message": f"Job {job_id} cancelled"},
         status_code=200
     )
 
 
 @router.get("/stream/{job_id}")
+@router.get("/jobs/{job_id}/stream")
 async def stream_job_progress(job_id: str):
     """
     Stream real-time progress updates for an analysis job using Server-Sent Events.
     
+    Events are pushed as soon as the job store reports a change (Redis Pub/Sub
+    or in-process notification) rather than on a fixed polling interval.
+    
     Args:
         job_id: Unique job identifier
         
     Returns:
         StreamingResponse with SSE events
     """
-    if job_id not in job_store:
+    if await job_store.get(job_id) is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
     def _json_safe(value):
@@ -558,73 +714,75 @@ async def stream_job_progress(job_id: str):
         last_status = None
         
         try:
-            while True:
-                if job_id not in job_store:
-                    break
+            # Subscribe before the first read so no change between the two is missed
+            async with job_store.watch(job_id) as watcher:
+                while True:
+                    job = await job_store.get(job_id)
+                    if job is None:
+                        break
+                        
+                    current_status = job.status
                     
-                job = job_store[job_id]
-                current_status = job.get("status", "pending")
-                
-                # Send status updates
-                if current_status != last_status:
-                    event_data = {
-                        "type": "status",
-                        "job_id": job_id,
-                        "status": current_status,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                    yield f"data: {json.dumps(event_data)}\n\n"
-                    last_status = current_status
-                
-                # Send execution step updates
-                steps = job.get("execution_steps", [])
-                
-                # Stream new execution steps
-                if len(steps) > last_step_count:
-                    for step in steps[last_step_count:]:
-                        step_data = {
-                            "type": "step",
+                    # Send status updates
+                    if current_status != last_status:
+                        event_data = {
+                            "type": "status",
                             "job_id": job_id,
-                            "step_name": step.get("step_name"),
-                            "status": step.get("status"),
-                            "timestamp": step.get("timestamp").isoformat() if hasattr(step.get("timestamp", None), 'isoformat') else str(step.get("timestamp")),
-                            "duration_ms": step.get("duration_ms"),
-                            "sql": step.get("sql"),
-                            "row_count": step.get("row_count"),
-                            "error": step.get("error"),
-                            "metadata": _json_safe(step.get("metadata", {}))
+                            "status": current_status,
+                            "timestamp": datetime.utcnow().isoformat()
                         }
-                        yield f"data: {json.dumps(step_data)}\n\n"
+                        yield f"data: {json.dumps(event_data)}\n\n"
+                        last_status = current_status
                     
-                    last_step_count = len(steps)
-                
-                # Send progress update
-                progress = calculate_job_progress(job)
-                if progress is not None:
-                    progress_data = {
-                        "type": "progress",
-                        "job_id": job_id,
-                        "progress": progress,
-                        "current_step": job.get("current_step"),
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                    yield f"data: {json.dumps(progress_data)}\n\n"
-                
-                # Send completion event and break
-                if current_status in ["completed", "failed", "cancelled"]:
-                    completion_data = {
-                        "type": "completion",
-                        "job_id": job_id,
-                        "status": current_status,
-                        "result": _json_safe(serialize_result(job.get("result"))) if current_status == "completed" else None,
-                        "error": job.get("error"),
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                    yield f"data: {json.dumps(completion_data)}\n\n"
-                    break
-                
-                # Wait before next update
-                await asyncio.sleep(0.5)
+                    # Send execution step updates
+                    steps = job.execution_steps
+                    
+                    # Stream new execution steps
+                    if len(steps) > last_step_count:
+                        for step in steps[last_step_count:]:
+                            step_data = {
+                                "type": "step",
+                                "job_id": job_id,
+                                "step_name": step.get("step_name"),
+                                "status": step.get("status"),
+                                "timestamp": step.get("timestamp").isoformat() if hasattr(step.get("timestamp", None), 'isoformat') else str(step.get("timestamp")),
+                                "duration_ms": step.get("duration_ms"),
+                                "sql": step.get("sql"),
+                                "row_count": step.get("row_count"),
+                                "error": step.get("error"),
+                                "metadata": _json_safe(step.get("metadata", {}))
+                            }
+                            yield f"data: {json.dumps(step_data)}\n\n"
+                        
+                        last_step_count = len(steps)
+                    
+                    # Send progress update
+                    progress = calculate_job_progress(job)
+                    if progress is not None:
+                        progress_data = {
+                            "type": "progress",
+                            "job_id": job_id,
+                            "progress": progress,
+                            "current_step": job.current_step,
+                            "timestamp": datetime.utcnow().isoformat()
+                        }
+                        yield f"data: {json.dumps(progress_data)}\n\n"
+                    
+                    # Send completion event and break
+                    if current_status in ["completed", "failed", "cancelled"]:
+                        completion_data = {
+                            "type": "completion",
+                            "job_id": job_id,
+                            "status": current_status,
+                            "result": _json_safe(serialize_result(job.result)) if current_status == "completed" else None,
+                            "error": job.error,
+                            "timestamp": datetime.utcnow().isoformat()
+                        }
+                        yield f"data: {json.dumps(completion_data)}\n\n"
+                        break
+                    
+                    # Wake on the next published change; the timeout is a safety net
+                    await watcher.wait(timeout=5.0)
                 
         except Exception as e:
             error_data = {
@@ -647,9 +805,9 @@ async def stream_job_progress(job_id: str):
     )
 
 
-def calculate_job_progress(job: Dict[str, Any]) -> Optional[float]:
+def calculate_job_progress(job: JobRecord) -> Optional[float]:
     """Calculate job progress percentage based on execution steps."""
-    status = job.get("status")
+    status = job.status
     
     if status == "pending":
         return 0.0
@@ -657,7 +815,7 @@ def calculate_job_progress(job: Dict[str, Any]) -> Optional[float]:
         return 100.0
     elif status == "running":
         # Calculate based on completed steps
-        steps = job.get("execution_steps", [])
+        steps = job.execution_steps
         
         if not steps:
             return 10.0  # Started but no steps yet
@@ -738,7 +896,8 @@ async def ask_question(
     # Run analysis
     result = await run_query(spec, request.data_source, background_tasks)
     
-    return AnalysisResponse(
+    # ``result`` was just built by run_query, so skip re-validating it
+    return AnalysisResponse.model_construct(
         job_id=result.job_id,
         status="completed" if result.quality.passed else "failed",
         result=result,
@@ -3,17 +3,64 @@ Health check endpoints for monitoring service status.
 """
 
 from datetime import datetime
+import asyncio
 import time
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 from fastapi import APIRouter, status
+from fastapi.responses import ORJSONResponse
 import structlog
 
+from analyst_agent.api.routes.analysis import analysis_queue_stats
 from analyst_agent.settings import settings
 from analyst_agent.schemas import HealthCheck
 
 logger = structlog.get_logger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Liveness/readiness probes arrive every few seconds from every pod, so the
+# dependency checks are served from memory for this long between refreshes.
+_HEALTH_CACHE_TTL_SECONDS = 1.0
+_health_cache: Optional[Tuple[float, HealthCheck]] = None
+
+
+async def _check_database() -> str:
+    """Probe the analysis database."""
+    # TODO: Implement actual database health check
+    return "healthy"
+
+
+async def _check_llm_provider() -> str:
+    """Probe the configured LLM provider."""
+    # TODO: Implement actual LLM provider health check
+    return "healthy"
+
+
+async def _probe_dependencies() -> Dict[str, str]:
+    """
+    Run all dependency probes concurrently.
+    
+    Returns:
+        Dict[str, str]: Status per dependency; a probe that raises is reported
+        as unhealthy instead of failing the whole health check.
+    """
+    probes = (
+        ("database", _check_database()),
+        ("llm_provider", _check_llm_provider()),
+    )
+    results = await asyncio.gather(
+        *(probe for _, probe in probes),
+        return_exceptions=True,
+    )
+    
+    dependencies: Dict[str, str] = {}
+    for (name, _), result in zip(probes, results, strict=True):
+        if isinstance(result, BaseException):
+            logger.warning("Health probe failed", dependency=name, error=str(result))
+            dependencies[name] = "unhealthy"
+        else:
+            dependencies[name] = result
+    return dependencies
 
 
 @router.get("/health", response_model=HealthCheck)
@@ -21,26 +68,36 @@ async def health_check() -> HealthCheck:
     """
     Check the health status of the service.
     
+    Results are cached for ``_HEALTH_CACHE_TTL_SECONDS`` so bursts of
+    probes do not each hit the dependencies. ``analysis_queue`` reports how
+    many analyses are running and waiting, for autoscalers.
+    
     Returns:
         HealthCheck: Service health information
     """
-    # Calculate uptime
+    global _health_cache
+    
+    now = time.monotonic()
+    if _health_cache is not None and now - _health_cache[0] < _HEALTH_CACHE_TTL_SECONDS:
+        return _health_cache[1]
+    
+    # Imported here to avoid a circular import with the app module; this only
+    # runs on a cache miss.
     from analyst_agent.api.app import app_start_time
-    uptime = time.time() - app_start_time
     
-    # TODO: Check dependencies (database, LLM providers, etc.)
-    dependencies: Dict[str, str] = {
-        "database": "healthy",  # TODO: Implement actual health checks
-        "llm_provider": "healthy",
-    }
+    dependencies = await _probe_dependencies()
+    overall = "healthy" if all(v == "healthy" for v in dependencies.values()) else "degraded"
     
-    return HealthCheck(
-        status="healthy",
+    health = HealthCheck(
+        status=overall,
         timestamp=datetime.utcnow(),
         version=settings.app_version,
-        uptime_seconds=uptime,
-        dependencies=dependencies
+        uptime_seconds=time.time() - app_start_time,
+        dependencies=dependencies,
+        analysis_queue=analysis_queue_stats()
     )
+    _health_cache = (now, health)
+    return health
 
 
 @router.get("/ready")
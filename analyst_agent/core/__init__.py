@@ -5,7 +5,7 @@ Provides the fundamental building blocks for data analysis workflows
 including state management, SQL execution, and LangGraph workflow orchestration.
 """
 
-from .state import AnalystState
+from .state import AnalystState, ErrorRecord, HistoryEntry
 from .nodes import *
 from .graph import create_analysis_graph
 from .sql_executor import *
@@ -13,6 +13,8 @@ from .llm_factory import LLMFactory, create_llm
 
 __all__ = [
     "AnalystState",
+    "ErrorRecord",
+    "HistoryEntry",
     "create_analysis_graph",
     "LLMFactory",
     "create_llm"
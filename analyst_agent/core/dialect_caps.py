@@ -5,11 +5,17 @@ Provides dialect-specific hints and capabilities to help the LLM generate
 correct SQL for different database systems without cross-dialect compilation.
 """
 
-from typing import Dict, Any, List, Optional
+import hashlib
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
 
 
-# Dialect capabilities for prompt engineering
-DIALECT_CAPABILITIES = {
+# Dialect capabilities for prompt engineering (read-only)
+DIALECT_CAPABILITIES: Mapping[str, Dict[str, Any]] = MappingProxyType({
     "postgres": {
         "limit": "LIMIT n",
         "date_trunc": "DATE_TRUNC('month', ts_column)",
@@ -137,7 +143,7 @@ DIALECT_CAPABILITIES = {
             "SELECT STRING_AGG(name, ',') FROM users"
         ]
     }
-}
+})
 
 
 def get_dialect_capabilities(dialect: str) -> Dict[str, Any]:
@@ -171,17 +177,14 @@ def build_sql_prompt(
     Returns:
         Formatted prompt for LLM
     """
-    caps = get_dialect_capabilities(dialect)
     constraints = constraints or {}
     
     # Build schema information
     schema_info = _format_schema_info(schema_card)
     
-    # Build capability hints
-    capability_hints = _format_capability_hints(caps)
-    
-    # Build examples
-    examples = _format_examples(caps.get("examples", []))
+    # Capability hints and examples are precomputed per dialect
+    capability_hints = _CAPABILITY_HINTS.get(dialect, _CAPABILITY_HINTS["postgres"])
+    examples = _EXAMPLES.get(dialect, _EXAMPLES["postgres"])
     
     prompt = f"""You are a data analyst who writes only {dialect.upper()} SQL. Do not use functions from other dialects.
 
@@ -339,88 +342,132 @@ Write only valid {dialect.upper()} SQL."""
     return prompt
 
 
+class _TableBlockKey:
+    """Hashable wrapper keying a table's schema details by a digest of their contents."""
+    
+    __slots__ = ("table", "details", "fingerprint")
+    
+    def __init__(self, table: str, details: Dict[str, Any]):
+        self.table = table
+        self.details = details
+        payload = orjson.dumps(details, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+        self.fingerprint = hashlib.blake2b(payload, digest_size=16).digest()
+    
+    def __hash__(self) -> int:
+        return hash((self.table, self.fingerprint))
+    
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, _TableBlockKey)
+            and other.table == self.table
+            and other.fingerprint == self.fingerprint
+        )
+
+
 def _format_schema_info(schema_card: Dict[str, Any]) -> str:
-    """Format schema information for prompts."""
+    """Format schema information for prompts from per-table cached blocks."""
     if not schema_card.get("tables"):
         return "Schema information not available."
     
-    info = []
-    for table, details in schema_card["tables"].items():
-        columns = details.get("columns", [])
-        col_info = []
-        for col in columns:
-            col_type = col.get("type", "unknown")
-            nullable = " NULL" if col.get("nullable", True) else " NOT NULL"
-            pk = " PRIMARY KEY" if col.get("primary_key", False) else ""
-            col_info.append(f"  {col['name']} {col_type}{nullable}{pk}")
-        
-        info.append(f"Table: {table}")
-        info.append("\n".join(col_info))
-
-        constraints = details.get("constraints") or {}
-        constraint_lines = []
-        pk = constraints.get("primary_key") or {}
-        pk_cols = pk.get("columns") or []
-        if pk_cols:
-            constraint_lines.append(f"Primary key: ({', '.join(pk_cols)})")
-
-        uniques = constraints.get("unique_constraints") or []
-        if uniques:
-            unique_parts = []
-            for unique in uniques:
-                cols = unique.get("columns") or []
-                if cols:
-                    unique_parts.append(f"({', '.join(cols)})")
-            if unique_parts:
-                constraint_lines.append(f"Unique: {', '.join(unique_parts)}")
-
-        fks = constraints.get("foreign_keys") or []
-        if fks:
-            fk_parts = []
-            for fk in fks:
-                cols = fk.get("columns") or []
-                ref_table = fk.get("referred_table")
-                ref_schema = fk.get("referred_schema")
-                ref_cols = fk.get("referred_columns") or []
-                if cols and ref_table:
-                    ref = ref_table
-                    if ref_schema:
-                        ref = f"{ref_schema}.{ref}"
-                    if ref_cols:
-                        ref = f"{ref}({', '.join(ref_cols)})"
-                    fk_parts.append(f"({', '.join(cols)}) -> {ref}")
-            if fk_parts:
-                constraint_lines.append("Foreign keys: " + "; ".join(fk_parts))
-
-        checks = constraints.get("check_constraints") or []
-        if checks:
-            check_parts = []
-            for check in checks:
-                expr = check.get("expression")
-                if expr:
-                    name = check.get("name")
-                    if name:
-                        check_parts.append(f"{name}: {expr}")
-                    else:
-                        check_parts.append(expr)
-            if check_parts:
-                constraint_lines.append("Checks: " + "; ".join(check_parts))
-
-        if constraint_lines:
-            info.append("Constraints:")
-            info.extend([f"  {line}" for line in constraint_lines])
-        
-        # Add sample data if available
-        if details.get("sample_rows"):
-            info.append("Sample data:")
-            for row in details["sample_rows"][:3]:
-                info.append(f"  {row}")
-        
-        info.append("")  # Empty line between tables
+    return "\n".join(
+        _format_table_block(_TableBlockKey(table, details))
+        for table, details in schema_card["tables"].items()
+    )
+
+
+@lru_cache(maxsize=512)
+def _format_table_block(key: _TableBlockKey) -> str:
+    """Format one table's columns, constraints and sample rows (newline-terminated)."""
+    table, details = key.table, key.details
     
+    info = []
+    info.append(f"Table: {table}")
+    for col in details.get("columns", []):
+        col_type = col.get("type", "unknown")
+        nullable = " NULL" if col.get("nullable", True) else " NOT NULL"
+        pk = " PRIMARY KEY" if col.get("primary_key", False) else ""
+        info.append(f"  {col['name']} {col_type}{nullable}{pk}")
+    
+    constraints = details.get("constraints") or {}
+    constraint_lines = []
+    pk = constraints.get("primary_key") or {}
+    pk_cols = pk.get("columns") or []
+    if pk_cols:
+        constraint_lines.append(f"Primary key: ({', '.join(pk_cols)})")
+    
+    uniques = constraints.get("unique_constraints") or []
+    if uniques:
+        unique_parts = []
+        for unique in uniques:
+            cols = unique.get("columns") or []
+            if cols:
+                unique_parts.append(f"({', '.join(cols)})")
+        if unique_parts:
+            constraint_lines.append(f"Unique: {', '.join(unique_parts)}")
+    
+    fks = constraints.get("foreign_keys") or []
+    if fks:
+        fk_parts = []
+        for fk in fks:
+            cols = fk.get("columns") or []
+            ref_table = fk.get("referred_table")
+            ref_schema = fk.get("referred_schema")
+            ref_cols = fk.get("referred_columns") or []
+            if cols and ref_table:
+                ref = ref_table
+                if ref_schema:
+                    ref = f"{ref_schema}.{ref}"
+                if ref_cols:
+                    ref = f"{ref}({', '.join(ref_cols)})"
+                fk_parts.append(f"({', '.join(cols)}) -> {ref}")
+        if fk_parts:
+            constraint_lines.append("Foreign keys: " + "; ".join(fk_parts))
+    
+    checks = constraints.get("check_constraints") or []
+    if checks:
+        check_parts = []
+        for check in checks:
+            expr = check.get("expression")
+            if expr:
+                name = check.get("name")
+                if name:
+                    check_parts.append(f"{name}: {expr}")
+                else:
+                    check_parts.append(expr)
+        if check_parts:
+            constraint_lines.append("Checks: " + "; ".join(check_parts))
+    
+    if constraint_lines:
+        info.append("Constraints:")
+        info.extend([f"  {line}" for line in constraint_lines])
+    
+    # Add sample data if available
+    if details.get("sample_rows_ipc"):
+        info.append("Sample data:")
+        info.append(_arrow_to_markdown(pa.ipc.open_stream(details["sample_rows_ipc"]).read_all()))
+    
+    info.append("")  # Empty line between tables
     return "\n".join(info)
 
 
+def _column_strings(column: pa.ChunkedArray) -> List[str]:
+    """Format a column's cells as strings in Arrow, with nulls shown as NULL."""
+    try:
+        return pc.fill_null(pc.cast(column, pa.string()), "NULL").to_pylist()
+    except (pa.ArrowNotImplementedError, pa.ArrowInvalid):
+        # Nested types (lists, structs) have no Arrow string cast
+        return ["NULL" if value is None else str(value) for value in column.to_pylist()]
+
+
+def _arrow_to_markdown(table: pa.Table, indent: str = "  ") -> str:
+    """Render an Arrow table as a markdown table, formatting column by column."""
+    header = " | ".join(table.column_names)
+    rule = " | ".join("---" for _ in table.column_names)
+    columns = [_column_strings(column) for column in table.columns]
+    lines = [header, rule] + [" | ".join(row) for row in zip(*columns, strict=True)]
+    return "\n".join(f"{indent}| {line} |" for line in lines)
+
+
 def _format_capability_hints(caps: Dict[str, Any]) -> str:
     """Format capability hints for prompts."""
     hints = []
@@ -464,3 +511,14 @@ def _format_examples(examples: List[str]) -> str:
         formatted.append(f"{i}. {example}")
     
     return "\n".join(formatted) 
+
+
+# Prompt fragments precomputed once since DIALECT_CAPABILITIES is static
+_CAPABILITY_HINTS: Dict[str, str] = {
+    dialect: _format_capability_hints(caps)
+    for dialect, caps in DIALECT_CAPABILITIES.items()
+}
+_EXAMPLES: Dict[str, str] = {
+    dialect: _format_examples(caps.get("examples", []))
+    for dialect, caps in DIALECT_CAPABILITIES.items()
+}
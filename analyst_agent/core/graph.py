@@ -5,12 +5,14 @@ Defines the complete analysis workflow with conditional routing between nodes
 based on execution results and quality thresholds.
 """
 
-from typing import Dict, Any, Literal, Optional
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Dict, Any, Literal, Mapping, Optional, Tuple
 import structlog
 from langgraph.graph import StateGraph, END
 from analyst_agent.settings import settings
 
-from .state import AnalystState, has_budget
+from .state import AnalystState, create_initial_state, has_budget, max_attempts_for_budget
 from .nodes import (
     plan,
     profile,
@@ -26,34 +28,56 @@ from .nodes import (
 logger = structlog.get_logger(__name__)
 
 
+# Routing tables indexed by a bitmask of the conditions each edge reads.
+# need_diagnostics: bit 0 = query failed, bit 1 = no rows, bit 2 = weird result
+_NEED_DIAG_TABLE: Tuple[str, ...] = ("transform",) + ("diagnose",) * 7
+# should_continue_iteration: bit 0 = below quality threshold, bit 1 = not
+# plateaued, bit 2 = budget left, bit 3 = attempts left; iterate only if all set
+_CONTINUE_TABLE: Tuple[str, ...] = ("present",) * 15 + ("diagnose",)
+_CONTINUE_UNLESS_BUDGET = 0b1011
+
+_QUALITY_THRESHOLD = 0.85
+
+# Hot state reads in the routers. create_initial_state always populates
+# these keys, so plain item access is safe.
+_get_rs = itemgetter("rs")
+_get_history = itemgetter("history")
+_get_quality = itemgetter("quality")
+
+# Shared read-only default for missing sub-dicts, so lookups on a sparse
+# state don't allocate a fresh {} per call
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+# Scalar part of the quality block reported for a failed run; _fail_run adds
+# fresh gates/notes containers so results never share mutable state
+_FAILED_QUALITY: Mapping[str, Any] = MappingProxyType({
+    "passed": False,
+    "score": 0.0,
+    "plateau": False
+})
+
+
 def need_diagnostics(state: AnalystState) -> Literal["diagnose", "transform"]:
     """
     Determine if diagnostics are needed after MVQ execution.
     
+    Diagnostics are needed if the query failed, returned no data, or the
+    latest history entry was flagged as a weird result.
+    
     Args:
         state: Current analysis state
         
     Returns:
         Next node to execute
     """
-    rs = state.get("rs", {})
+    rs = _get_rs(state)
+    history = _get_history(state)
     
-    # Need diagnostics if:
-    # 1. Query failed
-    # 2. Query returned no data
-    # 3. Previous attempts had weird results
     rs_failed = not rs.get("ok", False)
     rs_empty = rs.get("row_count", 0) == 0
+    weird_result = bool(history) and history[-1].flag_weird
     
-    # Check history for patterns that indicate we need diagnostics
-    history = state.get("history", [])
-    if history:
-        latest = history[-1]
-        weird_result = latest.get("flag_weird", False)
-    else:
-        weird_result = False
-    
-    needs_diag = rs_failed or rs_empty or weird_result
+    route = _NEED_DIAG_TABLE[rs_failed | (rs_empty << 1) | (weird_result << 2)]
     
     logger.debug(
         "Diagnostics decision",
@@ -61,83 +85,61 @@ def need_diagnostics(state: AnalystState) -> Literal["diagnose", "transform"]:
         rs_failed=rs_failed,
         rs_empty=rs_empty,
         weird_result=weird_result,
-        needs_diagnostics=needs_diag
+        needs_diagnostics=route == "diagnose"
     )
     
-    return "diagnose" if needs_diag else "transform"
+    return route
 
 
 def should_continue_iteration(state: AnalystState) -> Literal["diagnose", "present"]:
     """
     Determine if we should continue iterating or present final results.
     
+    Iteration continues only while quality is below threshold, quality has
+    not plateaued, the attempt limit (~20% of the query budget) has not been
+    reached, and budget remains. The budget is only checked when the other
+    conditions all hold (``budget_ok`` is logged as None otherwise).
+    
     Args:
         state: Current analysis state
         
     Returns:
         Next node to execute
     """
-    quality = state.get("quality", {})
+    quality = _get_quality(state)
     
-    # Get quality metrics
     quality_score = quality.get("score", 0.0)
-    quality_passed = quality.get("passed", False)
     plateau = quality.get("plateau", False)
-    
-    # Check budget
-    budget_ok = has_budget(state)
-    
-    # Check attempt count
-    max_attempts = state.get("spec", {}).get("budget", {}).get("queries", 30) // 5  # Use ~20% of query budget for attempts
+    max_attempts = state.get("max_attempts")
+    if max_attempts is None:
+        max_attempts = max_attempts_for_budget(state.get("spec", _EMPTY).get("budget", _EMPTY))
     attempt_count = state.get("attempt", 0)
     
-    # Continue iterating if:
-    # 1. Quality is below threshold AND
-    # 2. We haven't plateaued AND
-    # 3. We have budget AND
-    # 4. We haven't exceeded max attempts
-    should_continue = (
-        quality_score < 0.85 and
-        not plateau and
-        budget_ok and
-        attempt_count < max_attempts
+    flags = (
+        (quality_score < _QUALITY_THRESHOLD)
+        | ((not plateau) << 1)
+        | ((attempt_count < max_attempts) << 3)
     )
+    # The budget only matters if every other condition says keep going
+    budget_ok: Optional[bool] = None
+    if flags == _CONTINUE_UNLESS_BUDGET:
+        budget_ok = has_budget(state)
+        flags |= budget_ok << 2
+    route = _CONTINUE_TABLE[flags]
     
     logger.info(
         "Iteration decision",
         job_id=state.get("job_id"),
         quality_score=quality_score,
-        quality_passed=quality_passed,
+        quality_passed=quality.get("passed", False),
         plateau=plateau,
         budget_ok=budget_ok,
         attempt_count=attempt_count,
         max_attempts=max_attempts,
-        should_continue=should_continue
-    )
-    
-    return "diagnose" if should_continue else "present"
-
-
-def next_after_refine(state: AnalystState) -> Literal["diagnose", "transform"]:
-    """
-    Decide the next step after a refine attempt.
-    
-    Returns:
-        "transform" if refine produced a successful result,
-        otherwise "diagnose" to re-run troubleshooting with the new error.
-    """
-    rs = state.get("rs", {})
-    ok = rs.get("ok", False)
-    error = rs.get("error")
-    
-    logger.debug(
-        "Refine routing decision",
-        job_id=state.get("job_id"),
-        succeeded=ok,
-        error=error
+        should_continue=route == "diagnose"
     )
     
-    return "transform" if ok else "diagnose"
+    return route
 
 
 def create_analysis_graph() -> StateGraph:
@@ -170,42 +172,25 @@ def create_analysis_graph() -> StateGraph:
     graph.add_edge("plan", "profile")
     graph.add_edge("profile", "mvq")
     
+    # Conditional edges: each router returns the next node's name directly,
+    # and its Literal return annotation lets LangGraph validate the targets
+    # when the graph is built, so no path map is needed.
+    
     # Conditional: MVQ -> diagnostics or transform
-    graph.add_conditional_edges(
-        "mvq",
-        need_diagnostics,
-        {
-            "diagnose": "diagnose",
-            "transform": "transform"
-        }
-    )
+    graph.add_conditional_edges("mvq", need_diagnostics)
     
-    # Diagnostics leads to refinement
+    # Diagnostics leads to refinement; refine routes itself via Command
+    # (transform on success, validate once the budget is spent, back to
+    # diagnose otherwise)
     graph.add_edge("diagnose", "refine")
     
-    # Route after refinement based on success/failure
-    graph.add_conditional_edges(
-        "refine",
-        next_after_refine,
-        {
-            "transform": "transform",
-            "diagnose": "diagnose"
-        }
-    )
-    
     # Transform -> produce -> validate
     graph.add_edge("transform", "produce")
     graph.add_edge("produce", "validate")
     
-    # Conditional: validate -> continue iteration or present
-    graph.add_conditional_edges(
-        "validate",
-        should_continue_iteration,
-        {
-            "diagnose": "diagnose",  # Re-enter at diagnostics for escalation
-            "present": "present"
-        }
-    )
+    # Conditional: validate -> continue iteration (re-entering at diagnostics
+    # for escalation) or present
+    graph.add_conditional_edges("validate", should_continue_iteration)
     
     # Present is the final node
     graph.add_edge("present", END)
@@ -230,23 +215,62 @@ def compile_analysis_graph() -> Any:
     return compiled
 
 
-# Create a global instance for easy import
-analysis_graph = None
+# Compiled once at import and shared by every run; a compiled graph holds no
+# per-run state, so concurrent invocations are safe. A compile failure is
+# logged rather than breaking the import, and surfaces as a failed run.
+try:
+    ANALYSIS_GRAPH = compile_analysis_graph()
+except Exception as e:
+    logger.error("Failed to compile analysis workflow graph", error=str(e))
+    ANALYSIS_GRAPH = None
 
 
-def get_analysis_graph():
-    """
-    Get the compiled analysis graph (lazy initialization).
-    
-    Returns:
-        Compiled analysis graph
-    """
-    global analysis_graph
+# Invoke config shared by every run (recursion limit per LangGraph docs);
+# LangGraph copies the config rather than mutating it
+_INVOKE_CONFIG: Dict[str, Any] = {"recursion_limit": settings.graph_recursion_limit}
+
+
+def _prepare_run(
+    job_id: str,
+    spec: Dict[str, Any],
+    ctx: Dict[str, Any],
+    rls_context: Optional[Dict[str, Any]],
+    label: str
+) -> AnalystState:
+    """Log the start of a run and build its initial state."""
+    logger.info(f"Starting {label}", job_id=job_id)
+    return create_initial_state(job_id, spec, ctx, rls_context)
+
+
+def _complete_run(job_id: str, final_state: AnalystState, label: str) -> AnalystState:
+    """Log a successful run and return its final state."""
+    logger.info(
+        f"{label.capitalize()} completed",
+        job_id=job_id,
+        quality_score=final_state.get("quality", _EMPTY).get("score", 0),
+        total_attempts=final_state.get("attempt", 0),
+        has_answer=bool(final_state.get("answer"))
+    )
+    return final_state
+
+
+def _fail_run(job_id: str, initial_state: AnalystState, error: Exception, label: str) -> AnalystState:
+    """Log a failed run and turn its initial state into a failed result."""
+    error_message = str(error)
+    logger.error(f"{label.capitalize()} failed", job_id=job_id, error=error_message)
     
-    if analysis_graph is None:
-        analysis_graph = compile_analysis_graph()
+    failure = f"Analysis workflow failed: {error_message}"
+    initial_state["answer"] = failure
+    initial_state["quality"] = {**_FAILED_QUALITY, "gates": {}, "notes": [failure]}
     
-    return analysis_graph
+    return initial_state
+
+
+def _compiled_graph() -> Any:
+    """Return the shared compiled graph, raising if compilation failed at import."""
+    if ANALYSIS_GRAPH is None:
+        raise RuntimeError("Analysis workflow graph failed to compile")
+    return ANALYSIS_GRAPH
 
 
 def run_analysis(
@@ -267,48 +291,13 @@ def run_analysis(
     Returns:
         Final analysis state
     """
-    from .state import create_initial_state
-    
-    logger.info("Starting analysis workflow", job_id=job_id)
-    
-    # Create initial state
-    initial_state = create_initial_state(job_id, spec, ctx, rls_context)
-    
-    # Get compiled graph
-    graph = get_analysis_graph()
-    
+    label = "analysis workflow"
+    initial_state = _prepare_run(job_id, spec, ctx, rls_context, label)
     try:
-        # Execute the workflow
-        # Apply recursion limit via invoke config (per LangGraph docs)
-        final_state = graph.invoke(
-            initial_state,
-            config={"recursion_limit": settings.graph_recursion_limit},
-        )
-        
-        logger.info(
-            "Analysis workflow completed",
-            job_id=job_id,
-            quality_score=final_state.get("quality", {}).get("score", 0),
-            total_attempts=final_state.get("attempt", 0),
-            has_answer=bool(final_state.get("answer"))
-        )
-        
-        return final_state
-        
+        final_state = _compiled_graph().invoke(initial_state, config=_INVOKE_CONFIG)
     except Exception as e:
-        logger.error("Analysis workflow failed", job_id=job_id, error=str(e))
-        
-        # Return failed state
-        initial_state["answer"] = f"Analysis workflow failed: {str(e)}"
-        initial_state["quality"] = {
-            "passed": False,
-            "score": 0.0,
-            "gates": {},
-            "notes": [f"Workflow error: {str(e)}"],
-            "plateau": False
-        }
-        
-        return initial_state
+        return _fail_run(job_id, initial_state, e, label)
+    return _complete_run(job_id, final_state, label)
 
 
 async def run_analysis_async(
@@ -329,45 +318,10 @@ async def run_analysis_async(
     Returns:
         Final analysis state
     """
-    from .state import create_initial_state
-    
-    logger.info("Starting async analysis workflow", job_id=job_id)
-    
-    # Create initial state
-    initial_state = create_initial_state(job_id, spec, ctx, rls_context)
-    
-    # Get compiled graph
-    graph = get_analysis_graph()
-    
+    label = "async analysis workflow"
+    initial_state = _prepare_run(job_id, spec, ctx, rls_context, label)
     try:
-        # Execute the workflow asynchronously
-        # Apply recursion limit via invoke config (per LangGraph docs)
-        final_state = await graph.ainvoke(
-            initial_state,
-            config={"recursion_limit": settings.graph_recursion_limit},
-        )
-        
-        logger.info(
-            "Async analysis workflow completed",
-            job_id=job_id,
-            quality_score=final_state.get("quality", {}).get("score", 0),
-            total_attempts=final_state.get("attempt", 0),
-            has_answer=bool(final_state.get("answer"))
-        )
-        
-        return final_state
-        
+        final_state = await _compiled_graph().ainvoke(initial_state, config=_INVOKE_CONFIG)
     except Exception as e:
-        logger.error("Async analysis workflow failed", job_id=job_id, error=str(e))
-        
-        # Return failed state
-        initial_state["answer"] = f"Analysis workflow failed: {str(e)}"
-        initial_state["quality"] = {
-            "passed": False,
-            "score": 0.0,
-            "gates": {},
-            "notes": [f"Workflow error: {str(e)}"],
-            "plateau": False
-        }
-        
-        return initial_state 
+        return _fail_run(job_id, initial_state, e, label)
+    return _complete_run(job_id, final_state, label)
@@ -4,18 +4,93 @@ LLM Factory for multi-provider support.
 Supports OpenAI, Anthropic, and other providers with automatic fallback logic.
 """
 
-from typing import Optional, Dict, Any, List
+import threading
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Mapping, Tuple
+import httpx
 from langchain_core.language_models import BaseChatModel
 import structlog
 
 from analyst_agent.settings import settings
 
+# Provider SDKs are optional; resolve them once here instead of importing
+# inside every client construction
+try:
+    from langchain_openai import ChatOpenAI
+except ImportError:
+    ChatOpenAI = None
+
+try:
+    from langchain_anthropic import ChatAnthropic
+except ImportError:
+    ChatAnthropic = None
+
+try:
+    from langchain_community.llms import Ollama
+except ImportError:
+    Ollama = None
+
+try:
+    import ollama  # noqa: F401
+    _OLLAMA_AVAILABLE = True
+except ImportError:
+    _OLLAMA_AVAILABLE = False
+
+# Provider -> client class (None when its library isn't installed)
+_PROVIDER_CLASSES: Dict[str, Any] = {
+    "openai": ChatOpenAI,
+    "anthropic": ChatAnthropic,
+    "local": Ollama,
+}
+
+# OpenAI model names -> Anthropic equivalents, used when falling back to Anthropic
+_ANTHROPIC_MODEL_MAP: Mapping[str, str] = MappingProxyType({
+    "gpt-4": "claude-3-opus-20240229",
+    "gpt-4-turbo": "claude-3-sonnet-20240229",
+    "gpt-3.5-turbo": "claude-3-haiku-20240307",
+    "gpt-4o": "claude-3-5-sonnet-20241022",
+})
+_ANTHROPIC_DEFAULT_MODEL = "claude-3-sonnet-20240229"
+
+# One connection pool per process, shared by every OpenAI client the factory
+# builds, so cached instances (one per model/temperature/kwargs) reuse
+# keep-alive connections instead of each opening and handshaking their own
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+_SHARED_HTTP_CLIENT = httpx.Client(limits=_HTTP_LIMITS)
+_SHARED_ASYNC_HTTP_CLIENT = httpx.AsyncClient(limits=_HTTP_LIMITS)
+
+_ALL_PROVIDERS = ("openai", "anthropic", "local")
+
+
+def _fallback_order(openai_ok: bool, anthropic_ok: bool, primary_provider: str) -> Tuple[str, ...]:
+    """Order fallback providers, moving those with configured API keys to the front."""
+    prioritized: List[str] = []
+    for provider in _ALL_PROVIDERS:
+        if provider == primary_provider:
+            continue
+        if (provider == "openai" and openai_ok) or (provider == "anthropic" and anthropic_ok):
+            prioritized.insert(0, provider)
+        else:
+            prioritized.append(provider)
+    return tuple(prioritized)
+
+
+# (openai key set, anthropic key set, primary provider) -> fallback order
+_FALLBACK_TABLE: Dict[Tuple[bool, bool, str], Tuple[str, ...]] = {
+    (openai_ok, anthropic_ok, primary): _fallback_order(openai_ok, anthropic_ok, primary)
+    for openai_ok in (False, True)
+    for anthropic_ok in (False, True)
+    for primary in _ALL_PROVIDERS
+}
+
 logger = structlog.get_logger(__name__)
 
 class LLMFactory:
     """Factory for creating LLM instances across different providers."""
     
-    _cached_llms: Dict[str, BaseChatModel] = {}
+    _cached_llms: Dict[Tuple[Any, ...], BaseChatModel] = {}
+    # Guards construction so concurrent cold callers build each client once
+    _cache_lock = threading.Lock()
     
     @classmethod
     def create_llm(
@@ -40,11 +115,36 @@ class LLMFactory:
         provider = provider or settings.default_llm_provider
         model = model or settings.default_llm_model
         
-        cache_key = f"{provider}:{model}:{temperature}"
+        # kwargs change the client too; repr() keeps unhashable values usable
+        cache_key = (
+            provider,
+            model,
+            temperature,
+            tuple(sorted((k, repr(v)) for k, v in kwargs.items())),
+        )
         
-        if cache_key in cls._cached_llms:
-            return cls._cached_llms[cache_key]
+        # Fast path: no locking once the client exists
+        llm = cls._cached_llms.get(cache_key)
+        if llm is not None:
+            return llm
         
+        with cls._cache_lock:
+            # Another thread may have built it while we waited for the lock
+            llm = cls._cached_llms.get(cache_key)
+            if llm is not None:
+                return llm
+            return cls._build_llm(cache_key, provider, model, temperature, **kwargs)
+    
+    @classmethod
+    def _build_llm(
+        cls,
+        cache_key: Tuple[Any, ...],
+        provider: str,
+        model: str,
+        temperature: float,
+        **kwargs
+    ) -> BaseChatModel:
+        """Construct and cache an LLM, falling back to other providers (lock held)."""
         # If LangSmith tracing is enabled, ensure env is configured before model creation
         if settings.langsmith_tracing:
             import os
@@ -92,13 +192,19 @@ class LLMFactory:
         **kwargs
     ) -> Optional[BaseChatModel]:
         """Create LLM for specific provider."""
+        if provider in _PROVIDER_CLASSES and _PROVIDER_CLASSES[provider] is None:
+            logger.error("LLM provider library not installed", provider=provider)
+            return None
+        
         try:
             if provider == "openai":
                 if not settings.openai_api_key:
                     logger.warning("OpenAI API key not configured")
                     return None
                 
-                from langchain_openai import ChatOpenAI
+                # Callers may still supply their own clients
+                kwargs.setdefault("http_client", _SHARED_HTTP_CLIENT)
+                kwargs.setdefault("http_async_client", _SHARED_ASYNC_HTTP_CLIENT)
                 return ChatOpenAI(
                     model=model,
                     temperature=temperature,
@@ -111,9 +217,8 @@ class LLMFactory:
                     logger.warning("Anthropic API key not configured")
                     return None
                 
-                from langchain_anthropic import ChatAnthropic
                 # Map OpenAI model names to Anthropic equivalents
-                anthropic_model = cls._map_to_anthropic_model(model)
+                anthropic_model = _ANTHROPIC_MODEL_MAP.get(model, _ANTHROPIC_DEFAULT_MODEL)
                 return ChatAnthropic(
                     model=anthropic_model,
                     temperature=temperature,
@@ -123,7 +228,6 @@ class LLMFactory:
             
             elif provider == "local":
                 # For local models (Ollama, LM Studio, etc.)
-                from langchain_community.llms import Ollama
                 return Ollama(
                     model=model,
                     temperature=temperature,
@@ -134,11 +238,6 @@ class LLMFactory:
                 logger.error("Unsupported LLM provider", provider=provider)
                 return None
                 
-        except ImportError as e:
-            logger.error("LLM provider library not installed", 
-                        provider=provider, 
-                        error=str(e))
-            return None
         except Exception as e:
             logger.error("Failed to create LLM instance", 
                         provider=provider, 
@@ -147,33 +246,14 @@ class LLMFactory:
             return None
     
     @classmethod
-    def _map_to_anthropic_model(cls, openai_model: str) -> str:
-        """Map OpenAI model names to Anthropic equivalents."""
-        mapping = {
-            "gpt-4": "claude-3-opus-20240229",
-            "gpt-4-turbo": "claude-3-sonnet-20240229", 
-            "gpt-3.5-turbo": "claude-3-haiku-20240307",
-            "gpt-4o": "claude-3-5-sonnet-20241022"
-        }
-        return mapping.get(openai_model, "claude-3-sonnet-20240229")
-    
-    @classmethod
-    def _get_fallback_providers(cls, primary_provider: str) -> List[str]:
+    def _get_fallback_providers(cls, primary_provider: str) -> Tuple[str, ...]:
         """Get ordered list of fallback providers."""
-        all_providers = ["openai", "anthropic", "local"]
-        fallbacks = [p for p in all_providers if p != primary_provider]
-        
-        # Prioritize providers with available API keys
-        prioritized = []
-        for provider in fallbacks:
-            if provider == "openai" and settings.openai_api_key:
-                prioritized.insert(0, provider)
-            elif provider == "anthropic" and settings.anthropic_api_key:
-                prioritized.insert(0, provider)
-            else:
-                prioritized.append(provider)
-        
-        return prioritized
+        key = (bool(settings.openai_api_key), bool(settings.anthropic_api_key), primary_provider)
+        order = _FALLBACK_TABLE.get(key)
+        if order is None:
+            # Unknown primary provider: every known provider is a fallback
+            order = _fallback_order(key[0], key[1], primary_provider)
+        return order
     
     @classmethod
     def get_available_providers(cls) -> List[str]:
@@ -186,18 +266,16 @@ class LLMFactory:
             available.append("anthropic")
         
         # Local is always available if dependencies exist
-        try:
-            import ollama
+        if _OLLAMA_AVAILABLE:
             available.append("local")
-        except ImportError:
-            pass
         
         return available
     
     @classmethod
     def clear_cache(cls):
         """Clear the LLM cache."""
-        cls._cached_llms.clear()
+        with cls._cache_lock:
+            cls._cached_llms.clear()
         logger.info("LLM cache cleared")
 
 
@@ -5,22 +5,34 @@ These nodes implement the analysis lifecycle: plan → profile → mvq → diagn
 refine → produce → transform → validate → present
 """
 
+import base64
 import time
+from collections import deque
+from itertools import islice
 import json
 import uuid
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Literal, Optional
+import orjson
+import pyarrow as pa
 import structlog
+from langgraph.types import Command
 
 from .state import (
     AnalystState, 
+    HistoryEntry,
+    MAX_HISTORY_ENTRIES,
     add_execution_step, 
     has_budget,
     get_last_sql,
     get_last_error,
+    record_error,
     add_artifact,
     update_state_timestamp
 )
 from .sql_executor import (
+    dedupe_sqls,
+    refresh_rls_token,
     try_execute_sql,
     llm_generate_sql,
     llm_generate_diagnostics,
@@ -36,15 +48,47 @@ from analyst_agent.settings import settings
 
 logger = structlog.get_logger(__name__)
 
+# Fallback answers used by present() when the LLM answer is unavailable
+_ANSWER_OK = (
+    "Analysis completed successfully. Found {row_count} rows of data with "
+    "{columns} columns. The query returned relevant data for: {question}"
+)
+_ANSWER_TRANSFORM_FAILED = "Analysis completed with {row_count} rows of data, but transformation failed."
+_ANSWER_FAILED = "Analysis could not be completed. Error: {error}. Question was: {question}"
+
+
+def _json_safe_records(table: pa.Table) -> List[Dict[str, Any]]:
+    """
+    Convert an Arrow table to JSON-safe row dicts without going through pandas.
+    
+    Dates and timestamps become ISO strings and NaN becomes None; values
+    orjson can't encode natively (e.g. Decimal) fall back to ``str``.
+    """
+    return orjson.loads(orjson.dumps(table.to_pylist(), default=str))
+
+
+def _arrow_ipc_base64(table: pa.Table) -> str:
+    """Serialize an Arrow table as a base64-encoded Arrow IPC stream."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(sink.getvalue()).decode("ascii")
+
+
+def _skip_step(state: AnalystState, step_name: str, reason: str) -> AnalystState:
+    """Record a step as skipped (e.g. budget exhausted) without raising."""
+    add_execution_step(state, step_name=step_name, status="skipped", reason=reason)
+    return update_state_timestamp(state)
+
 
-def _build_history_notes(history: List[Dict[str, Any]], max_items: int = 3) -> List[str]:
+def _build_history_notes(history: List[HistoryEntry], max_items: int = 3) -> List[str]:
     """Collect concise notes from recent history entries for presentation context."""
     notes: List[str] = []
     for entry in reversed(history):
-        message = entry.get("notes") or entry.get("changes") or entry.get("error")
+        message = entry.notes or entry.changes or entry.error
         if not message:
             continue
-        stage = entry.get("stage", "step")
+        stage = entry.stage
         notes.append(f"{stage}: {message}")
         if len(notes) >= max_items:
             break
@@ -66,7 +110,7 @@ def _generate_llm_answer(state: AnalystState) -> Optional[str]:
     if not result_sql:
         history = state.get("history", [])
         for entry in reversed(history):
-            sql_candidate = entry.get("sql")
+            sql_candidate = entry.sql
             if sql_candidate:
                 result_sql = sql_candidate
                 break
@@ -121,7 +165,8 @@ def plan(state: AnalystState) -> AnalystState:
     This node analyzes the question and sets up the analysis context,
     including identifying key tables and metrics needed.
     """
-    logger.info("Starting analysis planning", job_id=state["job_id"])
+    log = logger.bind(job_id=state["job_id"])
+    log.info("Starting analysis planning")
     
     add_execution_step(
         state,
@@ -151,7 +196,7 @@ def plan(state: AnalystState) -> AnalystState:
             }
         )
         
-        logger.info("Analysis planning completed", job_id=state["job_id"])
+        log.info("Analysis planning completed")
         
     except Exception as e:
         add_execution_step(
@@ -160,7 +205,7 @@ def plan(state: AnalystState) -> AnalystState:
             status="failed",
             error=str(e)
         )
-        logger.error("Planning failed", job_id=state["job_id"], error=str(e))
+        log.error("Planning failed", error=str(e))
     
     return update_state_timestamp(state)
 
@@ -172,7 +217,8 @@ def profile(state: AnalystState) -> AnalystState:
     This node discovers available tables, columns, and sample data
     to inform SQL generation.
     """
-    logger.info("Starting database profiling", job_id=state["job_id"])
+    log = logger.bind(job_id=state["job_id"])
+    log.info("Starting database profiling")
     
     add_execution_step(
         state,
@@ -202,15 +248,14 @@ def profile(state: AnalystState) -> AnalystState:
                 "selected_tables": selected_tables,
                 "selection_method": selection_method,
                 "has_sample_data": any(
-                    table.get("sample_rows") 
+                    table.get("sample_rows_ipc") 
                     for table in schema_card.get("tables", {}).values()
                 )
             }
         )
         
-        logger.info(
+        log.info(
             "Database profiling completed",
-            job_id=state["job_id"],
             tables=table_count,
             tables_available=total_tables,
             selection_method=selection_method,
@@ -224,7 +269,7 @@ def profile(state: AnalystState) -> AnalystState:
             status="failed",
             error=str(e)
         )
-        logger.error("Profiling failed", job_id=state["job_id"], error=str(e))
+        log.error("Profiling failed", error=str(e))
         
         # Set empty schema card as fallback
         state["ctx"]["schema_card"] = {"tables": {}, "error": str(e)}
@@ -239,7 +284,14 @@ def mvq(state: AnalystState) -> AnalystState:
     This node generates the initial SQL query to answer the question
     using the discovered schema information.
     """
-    logger.info("Generating minimal viable query", job_id=state["job_id"])
+    log = logger.bind(job_id=state["job_id"])
+    
+    if not has_budget(state):
+        log.warning("Skipping MVQ - budget exhausted")
+        state["rs"] = {"ok": False, "error": "Budget exhausted"}
+        return _skip_step(state, "mvq", "budget_exhausted")
+    
+    log.info("Generating minimal viable query")
     
     add_execution_step(
         state,
@@ -248,9 +300,6 @@ def mvq(state: AnalystState) -> AnalystState:
     )
     
     try:
-        if not has_budget(state):
-            raise Exception("Budget exhausted")
-        
         # Build SQL generation prompt
         dialect = state["ctx"]["dialect"]
         question = state["spec"]["question"]
@@ -273,17 +322,17 @@ def mvq(state: AnalystState) -> AnalystState:
         
         # Track in history
         if "history" not in state:
-            state["history"] = []
-        
-        state["history"].append({
-            "stage": "mvq",
-            "sql": sql,
-            "notes": notes,
-            "ok": result["ok"],
-            "row_count": result.get("row_count", 0),
-            "error": result.get("error"),
-            "timestamp": time.time()
-        })
+            state["history"] = deque(maxlen=MAX_HISTORY_ENTRIES)
+        
+        state["history"].append(HistoryEntry(
+            stage="mvq",
+            sql=sql,
+            notes=notes,
+            ok=result["ok"],
+            row_count=result.get("row_count", 0),
+            error=result.get("error"),
+            timestamp=time.time()
+        ))
         
         add_execution_step(
             state,
@@ -295,15 +344,13 @@ def mvq(state: AnalystState) -> AnalystState:
         )
         
         if result["ok"]:
-            logger.info(
+            log.info(
                 "MVQ executed successfully",
-                job_id=state["job_id"],
                 rows=result.get("row_count", 0)
             )
         else:
-            logger.warning(
+            log.warning(
                 "MVQ execution failed",
-                job_id=state["job_id"],
                 error=result.get("error", "Unknown error")
             )
         
@@ -314,7 +361,7 @@ def mvq(state: AnalystState) -> AnalystState:
             status="failed",
             error=str(e)
         )
-        logger.error("MVQ generation failed", job_id=state["job_id"], error=str(e))
+        log.error("MVQ generation failed", error=str(e))
         state["rs"] = {"ok": False, "error": str(e)}
     
     state["attempt"] = state.get("attempt", 0) + 1
@@ -327,7 +374,13 @@ def diagnose(state: AnalystState) -> AnalystState:
     
     This node generates and executes diagnostic SQL to debug issues.
     """
-    logger.info("Running diagnostics", job_id=state["job_id"])
+    log = logger.bind(job_id=state["job_id"])
+    
+    if not has_budget(state):
+        log.warning("Skipping diagnostics - budget exhausted")
+        return _skip_step(state, "diagnose", "budget_exhausted")
+    
+    log.info("Running diagnostics")
     
     add_execution_step(
         state,
@@ -336,10 +389,6 @@ def diagnose(state: AnalystState) -> AnalystState:
     )
     
     try:
-        if not has_budget(state):
-            logger.warning("Skipping diagnostics - budget exhausted")
-            return state
-        
         # Get last error and SQL
         last_sql = get_last_sql(state) or "No SQL available"
         last_error = get_last_error(state) or state["rs"].get("error", "No data returned")
@@ -361,13 +410,24 @@ def diagnose(state: AnalystState) -> AnalystState:
         diag_plan = llm_generate_diagnostics(prompt)
         diagnostic_sqls = diag_plan.get("diagnostic_sqls", [])
         
-        # Execute diagnostic queries
-        diagnostics = []
-        for sql in diagnostic_sqls[:5]:  # Limit to 5 diagnostics
-            if not has_budget(state):
-                break
-            result = try_execute_sql(state, sql)
-            diagnostics.append(result)
+        # Execute distinct diagnostic queries (at most 5, and no more than
+        # the query budget allows). The remaining budget is read once up
+        # front (the node already returned if it was spent); the probes are
+        # independent, so run them concurrently: the step then costs the
+        # slowest query rather than the sum of all. The RLS token is
+        # refreshed once here so the probe threads never refresh (and
+        # rewrite) the shared RLS context concurrently.
+        remaining_queries = state["budget_remaining"]["queries"]
+        runnable = dedupe_sqls(diagnostic_sqls)[:min(5, remaining_queries)]
+        if runnable:
+            refresh_rls_token(state)
+            with ThreadPoolExecutor(max_workers=len(runnable)) as executor:
+                diagnostics = list(executor.map(
+                    lambda sql: try_execute_sql(state, sql, refresh_rls=False),
+                    runnable
+                ))
+        else:
+            diagnostics = []
         
         state["diagnostics"] = diagnostics
         
@@ -385,9 +445,8 @@ def diagnose(state: AnalystState) -> AnalystState:
             }
         )
         
-        logger.info(
+        log.info(
             "Diagnostics completed",
-            job_id=state["job_id"],
             successful=successful,
             total=len(diagnostics)
         )
@@ -399,20 +458,30 @@ def diagnose(state: AnalystState) -> AnalystState:
             status="failed",
             error=str(e)
         )
-        logger.error("Diagnostics failed", job_id=state["job_id"], error=str(e))
+        log.error("Diagnostics failed", error=str(e))
         state["diagnostics"] = []
     
     return update_state_timestamp(state)
 
 
-def refine(state: AnalystState) -> AnalystState:
+def refine(state: AnalystState) -> Command[Literal["transform", "diagnose", "validate"]]:
     """
     Refine the SQL query based on diagnostic results.
     
     This node uses diagnostic information to fix the SQL query
-    and try again with corrections.
+    and try again with corrections. It routes itself: on success the
+    workflow continues to ``transform``, otherwise back to ``diagnose`` to
+    troubleshoot the new error. With the budget exhausted it skips straight
+    to ``validate``, since another diagnose/refine round could not run.
     """
-    logger.info("Refining query", job_id=state["job_id"])
+    log = logger.bind(job_id=state["job_id"])
+    
+    if not has_budget(state):
+        log.warning("Skipping refinement - budget exhausted")
+        state["rs"] = {"ok": False, "error": "Budget exhausted"}
+        return Command(update=_skip_step(state, "refine", "budget_exhausted"), goto="validate")
+    
+    log.info("Refining query")
     
     add_execution_step(
         state,
@@ -421,9 +490,6 @@ def refine(state: AnalystState) -> AnalystState:
     )
     
     try:
-        if not has_budget(state):
-            raise Exception("Budget exhausted")
-        
         # Get refinement context
         dialect = state["ctx"]["dialect"]
         question = state["spec"]["question"]
@@ -450,15 +516,15 @@ def refine(state: AnalystState) -> AnalystState:
         state["rs"] = result
         
         # Track in history
-        state["history"].append({
-            "stage": "refine",
-            "sql": sql,
-            "changes": changes,
-            "ok": result["ok"],
-            "row_count": result.get("row_count", 0),
-            "error": result.get("error"),
-            "timestamp": time.time()
-        })
+        state["history"].append(HistoryEntry(
+            stage="refine",
+            sql=sql,
+            changes=changes,
+            ok=result["ok"],
+            row_count=result.get("row_count", 0),
+            error=result.get("error"),
+            timestamp=time.time()
+        ))
         
         add_execution_step(
             state,
@@ -471,17 +537,15 @@ def refine(state: AnalystState) -> AnalystState:
         )
         
         if result["ok"]:
-            logger.info(
+            log.info(
                 "Query refinement successful",
-                job_id=state["job_id"],
                 rows=result.get("row_count", 0)
             )
         else:
             state.setdefault("ctx", {})["last_failure_error"] = result.get("error")
             state["ctx"]["last_failure_stage"] = "refine"
-            logger.warning(
+            log.warning(
                 "Refined query still failed",
-                job_id=state["job_id"],
                 error=result.get("error", "Unknown error")
             )
         
@@ -492,21 +556,19 @@ def refine(state: AnalystState) -> AnalystState:
             status="failed",
             error=str(e)
         )
-        logger.error("Query refinement failed", job_id=state["job_id"], error=str(e))
+        log.error("Query refinement failed", error=str(e))
         state["rs"] = {"ok": False, "error": str(e)}
         state.setdefault("ctx", {})["last_failure_error"] = str(e)
         state["ctx"]["last_failure_stage"] = "refine"
-        if "errors" not in state:
-            state["errors"] = []
-        state["errors"].append({
-            "sql": None,
-            "error": str(e),
-            "timestamp": time.time(),
-            "duration_ms": None
-        })
+        record_error(state, str(e))
     
     state["attempt"] = state.get("attempt", 0) + 1
-    return update_state_timestamp(state)
+    update_state_timestamp(state)
+    
+    return Command(
+        update=state,
+        goto="transform" if state["rs"].get("ok", False) else "diagnose"
+    )
 
 
 def transform(state: AnalystState) -> AnalystState:
@@ -516,7 +578,8 @@ def transform(state: AnalystState) -> AnalystState:
     This node performs any necessary data transformations
     on the successful query results.
     """
-    logger.info("Transforming results", job_id=state["job_id"])
+    log = logger.bind(job_id=state["job_id"])
+    log.info("Transforming results")
     
     add_execution_step(
         state,
@@ -526,31 +589,32 @@ def transform(state: AnalystState) -> AnalystState:
     
     try:
         if not state["rs"].get("ok"):
-            logger.warning("Skipping transform - no successful results")
+            log.warning("Skipping transform - no successful results")
             return state
         
         # Get the result table
         table = state["rs"]["table"]
         
         if table.num_rows == 0:
-            logger.warning("No rows to transform")
+            log.warning("No rows to transform")
             state["shaped"] = {"empty": True}
             return state
         
-        # Convert to pandas for easier manipulation
-        df = table.to_pandas()
+        # Stay in Arrow: the summary only needs the schema, and the sample
+        # only needs the first rows, so the full result is never copied
+        column_names = table.column_names
         
         # Basic transformations (can be expanded)
         shaped_data = {
-            "dataframe": df,
+            "table": table,
             "summary": {
-                "rows": len(df),
-                "columns": len(df.columns),
-                "column_names": list(df.columns),
+                "rows": table.num_rows,
+                "columns": len(column_names),
+                "column_names": column_names,
                 # Ensure JSON-serializable dtypes (strings)
-                "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()}
+                "dtypes": {field.name: str(field.type) for field in table.schema}
             },
-            "sample": df.head(10).to_dict('records') if len(df) > 0 else []
+            "sample": _json_safe_records(table.slice(0, 10))
         }
         
         state["shaped"] = shaped_data
@@ -560,16 +624,15 @@ def transform(state: AnalystState) -> AnalystState:
             step_name="transform",
             status="completed",
             metadata={
-                "rows": len(df),
-                "columns": len(df.columns)
+                "rows": table.num_rows,
+                "columns": len(column_names)
             }
         )
         
-        logger.info(
+        log.info(
             "Data transformation completed",
-            job_id=state["job_id"],
-            rows=len(df),
-            columns=len(df.columns)
+            rows=table.num_rows,
+            columns=len(column_names)
         )
         
     except Exception as e:
@@ -579,7 +642,7 @@ def transform(state: AnalystState) -> AnalystState:
             status="failed",
             error=str(e)
         )
-        logger.error("Data transformation failed", job_id=state["job_id"], error=str(e))
+        log.error("Data transformation failed", error=str(e))
         state["shaped"] = {"error": str(e)}
     
     return update_state_timestamp(state)
@@ -592,7 +655,8 @@ def produce(state: AnalystState) -> AnalystState:
     This node creates the final data artifacts (tables, etc.)
     that will be returned to the user.
     """
-    logger.info("Producing artifacts", job_id=state["job_id"])
+    log = logger.bind(job_id=state["job_id"])
+    log.info("Producing artifacts")
     
     add_execution_step(
         state,
@@ -604,62 +668,69 @@ def produce(state: AnalystState) -> AnalystState:
         shaped_data = state.get("shaped", {})
         
         if shaped_data.get("empty") or shaped_data.get("error"):
-            logger.warning("No data to produce artifacts from")
+            log.warning("No data to produce artifacts from")
             return state
         
         # Create table artifact
-        df = shaped_data.get("dataframe")
-        if df is not None and len(df) > 0:
+        table = shaped_data.get("table")
+        if table is not None and table.num_rows > 0:
             artifact_id = f"table_{uuid.uuid4().hex[:8]}"
             
-            # Create table artifact
-            # Ensure JSON-safe records
-            try:
-                records = json.loads(df.to_json(orient='records', date_format='iso'))
-            except Exception:
-                records = df.astype(object).where(df.notna(), None).to_dict('records')
+            # Small results are inlined as JSON-safe records; large ones are
+            # shipped columnar (Arrow IPC) with the sample rows for display,
+            # instead of boxing every cell into a Python dict. ``truncated``
+            # tells consumers that ``data`` is only a sample of ``row_count``.
+            if table.num_rows <= settings.artifact_inline_max_rows:
+                content = {
+                    "format": "records",
+                    "data": _json_safe_records(table),
+                    "truncated": False
+                }
+            else:
+                content = {
+                    "format": "arrow_ipc",
+                    "data_arrow": _arrow_ipc_base64(table),
+                    "data": shaped_data.get("sample", []),
+                    "truncated": True
+                }
+            content["row_count"] = table.num_rows
+            content["columns"] = table.column_names
+            content["summary"] = shaped_data.get("summary", {})
 
             add_artifact(
                 state,
                 artifact_id=artifact_id,
                 kind="table",
                 title="Analysis Results",
-                content={
-                    "data": records,
-                    "columns": list(df.columns),
-                    "summary": shaped_data.get("summary", {})
-                }
+                content=content
             )
             
-            logger.info(
+            log.info(
                 "Created table artifact",
-                job_id=state["job_id"],
                 artifact_id=artifact_id,
-                rows=len(df)
+                rows=table.num_rows,
+                format=content["format"]
             )
         
-        # Create SQL artifact from history
-        if state.get("history"):
-            successful_queries = [
-                h for h in state["history"] 
-                if h.get("ok") and h.get("sql")
-            ]
+        # Create SQL artifact from the most recent successful query in history
+        latest_query = next(
+            (h for h in reversed(state.get("history", [])) if h.ok and h.sql),
+            None
+        )
+        if latest_query is not None:
+            sql_artifact_id = f"sql_{uuid.uuid4().hex[:8]}"
             
-            if successful_queries:
-                latest_query = successful_queries[-1]
-                sql_artifact_id = f"sql_{uuid.uuid4().hex[:8]}"
-                
-                add_artifact(
-                    state,
-                    artifact_id=sql_artifact_id,
-                    kind="sql",
-                    title="Final SQL Query",
-                    content={
-                        "sql": latest_query["sql"],
-                        "notes": latest_query.get("notes", ""),
-                        "row_count": latest_query.get("row_count", 0)
-                    }
-                )
+            add_artifact(
+                state,
+                artifact_id=sql_artifact_id,
+                kind="sql",
+                title="Final SQL Query",
+                content={
+                    "sql": latest_query.sql,
+                    "notes": latest_query.notes,
+                    "row_count": latest_query.row_count
+                }
+            )
         
         add_execution_step(
             state,
@@ -670,9 +741,8 @@ def produce(state: AnalystState) -> AnalystState:
             }
         )
         
-        logger.info(
+        log.info(
             "Artifact production completed",
-            job_id=state["job_id"],
             artifacts=len(state.get("artifacts", []))
         )
         
@@ -683,7 +753,7 @@ def produce(state: AnalystState) -> AnalystState:
             status="failed",
             error=str(e)
         )
-        logger.error("Artifact production failed", job_id=state["job_id"], error=str(e))
+        log.error("Artifact production failed", error=str(e))
     
     return update_state_timestamp(state)
 
@@ -695,7 +765,8 @@ def validate(state: AnalystState) -> AnalystState:
     This node performs quality checks on the results and
     determines if they meet the required standards.
     """
-    logger.info("Validating results", job_id=state["job_id"])
+    log = logger.bind(job_id=state["job_id"])
+    log.info("Validating results")
     
     add_execution_step(
         state,
@@ -734,7 +805,7 @@ def validate(state: AnalystState) -> AnalystState:
         # Check for plateau (no improvement over attempts)
         plateau = False
         if state.get("attempt", 0) >= 3:
-            recent_scores = [h.get("score", 0) for h in state.get("history", [])[-2:]]
+            recent_scores = [h.score for h in islice(reversed(state.get("history", [])), 2)]
             if recent_scores and all(s <= score + 0.01 for s in recent_scores):
                 plateau = True
         
@@ -766,9 +837,8 @@ def validate(state: AnalystState) -> AnalystState:
             }
         )
         
-        logger.info(
+        log.info(
             "Validation completed",
-            job_id=state["job_id"],
             score=score,
             passed=quality_report["passed"]
         )
@@ -780,7 +850,7 @@ def validate(state: AnalystState) -> AnalystState:
             status="failed",
             error=str(e)
         )
-        logger.error("Validation failed", job_id=state["job_id"], error=str(e))
+        log.error("Validation failed", error=str(e))
         
         # Set minimal quality report
         state["quality"] = {
@@ -801,7 +871,8 @@ def present(state: AnalystState) -> AnalystState:
     This node creates the final answer and prepares all outputs
     for return to the user.
     """
-    logger.info("Presenting results", job_id=state["job_id"])
+    log = logger.bind(job_id=state["job_id"])
+    log.info("Presenting results")
     
     add_execution_step(
         state,
@@ -825,15 +896,16 @@ def present(state: AnalystState) -> AnalystState:
                 shaped_data = state.get("shaped", {})
                 if shaped_data and not shaped_data.get("error"):
                     summary = shaped_data.get("summary", {})
-                    answer = (
-                        f"Analysis completed successfully. Found {row_count} rows of data with "
-                        f"{summary.get('columns', 0)} columns. The query returned relevant data for: {question}"
+                    answer = _ANSWER_OK.format(
+                        row_count=row_count,
+                        columns=summary.get("columns", 0),
+                        question=question
                     )
                 else:
-                    answer = f"Analysis completed with {row_count} rows of data, but transformation failed."
+                    answer = _ANSWER_TRANSFORM_FAILED.format(row_count=row_count)
         else:
             error = state["rs"].get("error", "Unknown error")
-            answer = f"Analysis could not be completed. Error: {error}. Question was: {question}"
+            answer = _ANSWER_FAILED.format(error=error, question=question)
         
         state["answer"] = answer
         state["answer_source"] = answer_source
@@ -852,9 +924,8 @@ def present(state: AnalystState) -> AnalystState:
             }
         )
         
-        logger.info(
+        log.info(
             "Presentation completed",
-            job_id=state["job_id"],
             has_answer=bool(state.get("answer"))
         )
         
@@ -865,7 +936,7 @@ def present(state: AnalystState) -> AnalystState:
             status="failed",
             error=str(e)
         )
-        logger.error("Presentation failed", job_id=state["job_id"], error=str(e))
+        log.error("Presentation failed", error=str(e))
         
         # Set fallback answer
         state["answer"] = f"Analysis encountered an error during presentation: {str(e)}"
@@ -7,15 +7,43 @@ of access tokens to ensure long-running analysis jobs complete successfully.
 
 from __future__ import annotations
 
+import atexit
+import threading
 import time
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 import httpx
 import structlog
-from jose import jwt
+from jose import JWTError, jwt
 
 logger = structlog.get_logger(__name__)
 
+# Token managers are created per job, so the connection pool lives at module
+# scope: refreshes against the same Supabase project reuse keep-alive
+# connections instead of paying a TCP/TLS handshake each time
+_http_client = httpx.Client(
+    timeout=10.0,
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+)
+atexit.register(_http_client.close)
+
+
+# Supabase signing keys rarely rotate; keep each project's JWKS for an hour.
+# Module-level (keyed by project URL) because managers are created per job.
+_JWKS_TTL_SECONDS = 3600.0
+# Unknown key ids force a refetch (for rotations), but no more often than this
+_JWKS_MIN_REFRESH_SECONDS = 60.0
+_JWKS_ALGORITHMS = ["RS256", "ES256"]
+_jwks_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_jwks_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def _token_exp(access_token: str) -> Optional[float]:
+    """Return the token's ``exp`` claim; tokens are immutable, so cache by value."""
+    return jwt.get_unverified_claims(access_token).get("exp")
+
 
 class RLSTokenManager:
     """Handle Supabase RLS token validation and refresh."""
@@ -39,12 +67,11 @@ class RLSTokenManager:
     def is_token_expired(self, access_token: str) -> bool:
         """Return True if the token is expired or close to expiring."""
         try:
-            claims = jwt.get_unverified_claims(access_token)
+            exp = _token_exp(access_token)
         except Exception as exc:  # pragma: no cover - defensive logging
             logger.warning("Failed to parse RLS access token", error=str(exc))
             return True
 
-        exp = claims.get("exp")
         if exp is None:
             logger.warning("Supabase access token missing exp claim")
             return True
@@ -52,6 +79,66 @@ class RLSTokenManager:
         remaining = exp - time.time()
         return remaining < self.refresh_threshold_seconds
 
+    def _get_jwks(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Return the project's JWKS, fetching it when missing or stale.
+
+        A forced refresh is honoured at most once per
+        ``_JWKS_MIN_REFRESH_SECONDS`` per project; in between the cached set
+        is returned, so tokens with unknown key ids fail without a fetch.
+        """
+        max_age = _JWKS_MIN_REFRESH_SECONDS if force_refresh else _JWKS_TTL_SECONDS
+        cached = _jwks_cache.get(self.supabase_url)
+        if cached is not None and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+
+        with _jwks_lock:
+            # Another thread may have fetched it while we waited
+            cached = _jwks_cache.get(self.supabase_url)
+            if cached is not None and time.monotonic() - cached[0] < max_age:
+                return cached[1]
+
+            endpoint = f"{self.supabase_url}/auth/v1/.well-known/jwks.json"
+            try:
+                response = _http_client.get(endpoint, headers={"apikey": self.anon_key})
+                response.raise_for_status()
+            except httpx.HTTPError as exc:
+                raise ValueError(f"JWKS request failed: {exc}") from exc
+
+            jwks = response.json()
+            _jwks_cache[self.supabase_url] = (time.monotonic(), jwks)
+            logger.info("Fetched Supabase JWKS", keys=len(jwks.get("keys", [])))
+            return jwks
+
+    def verify_token(self, access_token: str) -> Dict[str, Any]:
+        """
+        Verify an access token's signature against the project's JWKS.
+
+        The JWKS is cached per project; a token signed with a key id the
+        cached set doesn't know triggers a refetch, in case the keys were
+        rotated. Refetches are rate-limited per project, so a stream of
+        unknown key ids is rejected against the cached set.
+
+        Args:
+            access_token: Supabase-issued JWT
+
+        Returns:
+            Verified token claims
+        """
+        try:
+            kid = jwt.get_unverified_header(access_token).get("kid")
+            jwks = self._get_jwks()
+            if kid is not None and not any(key.get("kid") == kid for key in jwks.get("keys", [])):
+                jwks = self._get_jwks(force_refresh=True)
+            return jwt.decode(
+                access_token,
+                jwks,
+                algorithms=_JWKS_ALGORITHMS,
+                options={"verify_aud": False},
+            )
+        except JWTError as exc:
+            raise ValueError(f"Access token verification failed: {exc}") from exc
+
     def refresh_token_if_needed(
         self,
         access_token: str,
@@ -79,8 +166,7 @@ class RLSTokenManager:
         }
 
         try:
-            with httpx.Client(timeout=10.0) as client:
-                response = client.post(endpoint, json=payload, headers=headers)
+            response = _http_client.post(endpoint, json=payload, headers=headers)
         except httpx.HTTPError as exc:
             raise ValueError(f"Token refresh request failed: {exc}") from exc
 
@@ -5,16 +5,26 @@ Provides a centralized system for executing SQL queries with proper
 error handling, budget consumption, and result formatting.
 """
 
+import copy
+import logging
+import re
 import time
-import json
 import hashlib
-from typing import Dict, Any, Optional, List
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Optional, List, Mapping, Set, Tuple
+import orjson
+import pyarrow as pa
 import structlog
+from cachetools import TTLCache
 from jose import jwt
 from .llm_factory import create_llm
 from analyst_agent.settings import settings
+from analyst_agent.logging_config import log_enabled_for
 
-from .state import AnalystState, consume_budget, add_execution_step
+from .state import AnalystState, consume_budget, add_execution_step, record_error
 from .rls_manager import RLSTokenManager
 from .dialect_caps import (
     build_sql_prompt,
@@ -24,12 +34,282 @@ from .dialect_caps import (
 
 logger = structlog.get_logger(__name__)
 
+# Parsed LLM responses (SQL, diagnostics, table selection) keyed by a digest
+# of (kind, model, temperature, prompt). Prompts embed the dialect, question,
+# schema card/table list and any failed SQL/diagnostics, so an identical
+# prompt means an identical request and the round-trip can be skipped. Only
+# successfully parsed responses are stored.
+_llm_cache: TTLCache = TTLCache(
+    maxsize=max(settings.llm_cache_max_entries, 1),
+    ttl=max(settings.llm_cache_ttl_seconds, 1)
+)
+_llm_cache_lock = threading.Lock()
+
+# Above this temperature a repeated prompt is expected to sample a different
+# answer (e.g. a retry hoping for better SQL), so replies are not reused
+_LLM_CACHE_MAX_TEMPERATURE = 0.1
+
+
+def _llm_cache_enabled() -> bool:
+    """Whether LLM replies may be cached under the current settings."""
+    return (
+        settings.llm_cache_ttl_seconds > 0
+        and settings.llm_temperature <= _LLM_CACHE_MAX_TEMPERATURE
+    )
+
+
+def _llm_cache_key(kind: str, model: str, prompt: str) -> bytes:
+    """Digest identifying one LLM generation request."""
+    payload = f"{kind}\0{model}\0{settings.llm_temperature}\0{prompt}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _llm_cache_get(key: bytes) -> Optional[Dict[str, Any]]:
+    """Return a private copy of a cached generation, or None on a miss."""
+    if not _llm_cache_enabled():
+        return None
+    with _llm_cache_lock:
+        cached = _llm_cache.get(key)
+    # Callers may mutate the result (e.g. append to lists); keep the cache clean
+    return copy.deepcopy(cached) if cached is not None else None
+
+
+def _llm_cache_put(key: bytes, result: Dict[str, Any]) -> None:
+    """Store a parsed generation for reuse by identical prompts."""
+    if not _llm_cache_enabled():
+        return
+    with _llm_cache_lock:
+        _llm_cache[key] = copy.deepcopy(result)
+
+
+# Markdown code fence (optionally tagged json) wrapping an LLM's JSON reply
+_CODE_FENCE_RE = re.compile(r"\A\s*```(?:json)?\s*|\s*```\s*\Z", re.IGNORECASE)
+
+
+# Fallback SQL extraction from an unparseable reply: from the start of the
+# first line mentioning SELECT through the first line ending in ';' (or the
+# end of the reply)
+_FALLBACK_SQL_RE = re.compile(
+    r"^[^\n]*?SELECT.*?(?:;[ \t\r\f\v]*$|\Z)",
+    re.IGNORECASE | re.MULTILINE | re.DOTALL
+)
+
+
+def _strip_code_fence(content: str) -> str:
+    """Strip surrounding whitespace and any markdown code fence from an LLM reply."""
+    return _CODE_FENCE_RE.sub("", content).strip()
+
+
+def _stream_json_reply(llm: Any, prompt: str) -> str:
+    """
+    Stream an LLM reply that should hold a JSON object, stopping at its end.
+    
+    Each chunk that could close the object (contains ``}``) triggers a parse
+    attempt; once the text parses, the stream is dropped, so any closing
+    fence or trailing commentary the model adds is never waited for.
+    
+    Args:
+        llm: Chat model to invoke
+        prompt: Prompt text
+        
+    Returns:
+        The reply with surrounding whitespace and code fence stripped
+    """
+    parts: List[str] = []
+    for chunk in llm.stream(prompt):
+        text = chunk.content
+        if not isinstance(text, str) or not text:
+            continue
+        parts.append(text)
+        if "}" in text:
+            content = _strip_code_fence("".join(parts))
+            try:
+                orjson.loads(content)
+            except orjson.JSONDecodeError:
+                continue
+            return content
+    return _strip_code_fence("".join(parts))
+
+
+def clear_llm_cache() -> None:
+    """Drop all cached LLM generations (e.g. after a schema change)."""
+    with _llm_cache_lock:
+        _llm_cache.clear()
+
+
+# Schema profiling results keyed by (connection fingerprint, table), with
+# table None holding the table listing. Connectors are built per job, so the
+# fingerprint is derived from the connection URL rather than the instance.
+_schema_cache: TTLCache = TTLCache(maxsize=256, ttl=max(settings.schema_cache_ttl_seconds, 1))
+_schema_cache_lock = threading.Lock()
+
+# Upper bound on concurrent metadata reads while profiling, to stay within
+# typical pool sizes
+_PROFILE_WORKERS = 8
+
+# Table names shown to the LLM for selection. The listing fetches one extra
+# name (capped server-side) so the prompt can still say the list is truncated.
+_PROMPT_TABLE_LIMIT = 200
+
+
+def _connection_fingerprint(state: AnalystState) -> Optional[bytes]:
+    """
+    Identify the database (and RLS identity) a job profiles against.
+    
+    Includes the connector's ``schema_version()`` when it offers one, so a
+    DDL change yields a new fingerprint once the connector's (short-lived)
+    version memo expires.
+    Returns None, disabling caching, for connectors without a ``url``.
+    """
+    if settings.schema_cache_ttl_seconds <= 0:
+        return None
+    connector = state["ctx"]["connector"]
+    url = getattr(connector, "url", None)
+    if url is None:
+        return None
+    schema_version = None
+    schema_version_fn = getattr(connector, "schema_version", None)
+    if callable(schema_version_fn):
+        try:
+            schema_version = schema_version_fn()
+        except Exception as e:  # A missing version only means TTL-based expiry
+            logger.warning("Failed to read schema version", error=str(e))
+    rls_context = state.get("rls_context") or state["ctx"].get("rls_context") or {}
+    payload = "\0".join((
+        type(connector).__qualname__,
+        str(url),
+        str(getattr(connector, "schema", None)),
+        str(schema_version),
+        rls_context.get("access_token") or "",
+    )).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _schema_cache_get(fingerprint: Optional[bytes], table: Optional[str]) -> Any:
+    """Return a private copy of a cached listing/profile, or None on a miss."""
+    if fingerprint is None:
+        return None
+    with _schema_cache_lock:
+        cached = _schema_cache.get((fingerprint, table))
+    return copy.deepcopy(cached) if cached is not None else None
+
+
+def _schema_cache_put(fingerprint: Optional[bytes], table: Optional[str], value: Any) -> None:
+    """Store a table listing (table None) or a table profile."""
+    if fingerprint is None:
+        return
+    with _schema_cache_lock:
+        _schema_cache[(fingerprint, table)] = copy.deepcopy(value)
+
+
+def invalidate_schema_cache(fingerprint: Optional[bytes] = None) -> None:
+    """
+    Drop cached schema profiling results, e.g. after DDL.
+    
+    Args:
+        fingerprint: Connection fingerprint to invalidate; all entries when None
+    """
+    with _schema_cache_lock:
+        if fingerprint is None:
+            _schema_cache.clear()
+            return
+        for key in [key for key in _schema_cache.keys() if key[0] == fingerprint]:
+            _schema_cache.pop(key, None)
+
+
+@lru_cache(maxsize=1024)
+def _describe_rls_token(access_token: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Return a loggable digest of an RLS access token and its non-sensitive claims.
+    
+    A job reuses one token across all its queries, so the hash and the
+    unverified decode are cached by token value. The returned claims dict
+    is shared between calls and must not be mutated.
+    """
+    # Log correlation only, not security: a short blake2b digest suffices
+    token_hash = hashlib.blake2b(access_token.encode("utf-8"), digest_size=8).hexdigest()
+    safe_claims: Optional[Dict[str, Any]] = None
+    try:
+        decoded_claims = jwt.get_unverified_claims(access_token)
+        safe_claims = {k: decoded_claims.get(k) for k in ("sub", "role", "aud", "iss", "exp")}
+    except Exception as decode_error:  # pragma: no cover - defensive logging
+        logger.warning("Failed to decode RLS access token", error=str(decode_error))
+    return token_hash, safe_claims
+
+
+def _resolve_rls_context(state: AnalystState) -> Optional[Dict[str, Any]]:
+    """Return the job's RLS context, keeping top-level state in sync with ctx."""
+    rls_context = state.get("rls_context")
+    if rls_context is None:
+        rls_context = state["ctx"].get("rls_context")
+        if rls_context is not None:
+            # Keep top-level state in sync for downstream nodes
+            state["rls_context"] = rls_context
+    return rls_context
+
+
+def refresh_rls_token(state: AnalystState) -> Optional[Dict[str, Any]]:
+    """
+    Refresh the job's RLS access token in place if it is close to expiry.
+    
+    Only acts when the RLS context asks for auto-refresh. Callers fanning
+    queries out across threads should call this once beforehand and pass
+    ``refresh_rls=False`` to ``try_execute_sql``, so concurrent queries never
+    spend the same refresh token or race on the context.
+    
+    Args:
+        state: Current analysis state
+        
+    Returns:
+        The (possibly updated) RLS context, or None without one
+    """
+    ctx = state["ctx"]
+    rls_context = _resolve_rls_context(state)
+    if not rls_context or not rls_context.get("access_token"):
+        return rls_context
+    
+    auto_refresh = rls_context.get("auto_refresh")
+    if auto_refresh is None:
+        auto_refresh = rls_context.get("autoRefresh")
+    if auto_refresh:
+        supabase_url = ctx.get("supabase_url")
+        anon_key = ctx.get("supabase_anon_key")
+        refresh_token = (
+            rls_context.get("refresh_token")
+            or rls_context.get("refreshToken")
+        )
+        if supabase_url and anon_key:
+            manager: Optional[RLSTokenManager] = ctx.get("_rls_token_manager")
+            if manager is None:
+                manager = RLSTokenManager(supabase_url=supabase_url, anon_key=anon_key)
+                ctx["_rls_token_manager"] = manager
+            new_access, new_refresh = manager.refresh_token_if_needed(
+                rls_context["access_token"],
+                refresh_token,
+            )
+            if new_access != rls_context["access_token"]:
+                rls_context["access_token"] = new_access
+            if new_refresh and new_refresh != refresh_token:
+                rls_context["refresh_token"] = new_refresh
+        else:
+            logger.warning(
+                "RLS auto-refresh requested but configuration missing",
+                job_id=state.get("job_id"),
+                has_supabase_url=bool(supabase_url),
+                has_anon_key=bool(anon_key),
+            )
+    # Update ctx reference to reflect any token changes
+    ctx["rls_context"] = rls_context
+    state["rls_context"] = rls_context
+    return rls_context
+
 
 def try_execute_sql(
     state: AnalystState, 
     sql: str, 
     row_cap: int = 100000,
-    timeout_seconds: int = 30
+    timeout_seconds: int = 30,
+    refresh_rls: bool = True
 ) -> Dict[str, Any]:
     """
     Execute SQL query with error handling and budget tracking.
@@ -39,85 +319,49 @@ def try_execute_sql(
         sql: SQL query to execute
         row_cap: Maximum number of rows to return
         timeout_seconds: Query timeout in seconds
+        refresh_rls: Refresh a near-expiry RLS token first; pass False when
+            the caller already did (see ``refresh_rls_token``)
         
     Returns:
         Dictionary with execution results
     """
-    connector = state["ctx"]["connector"]
-    dialect = state["ctx"]["dialect"]
-    rls_context = state.get("rls_context")
-    if rls_context is None:
-        rls_context = state.get("ctx", {}).get("rls_context")
-        if rls_context is not None:
-            # Keep top-level state in sync for downstream nodes
-            state["rls_context"] = rls_context
+    ctx = state["ctx"]
+    connector = ctx["connector"]
+    dialect = ctx["dialect"]
+    log = logger.bind(job_id=state.get("job_id"), dialect=dialect)
+    rls_context = _resolve_rls_context(state)
     
-    start_time = time.perf_counter()
+    table = None
+    sql_final = sql
+    error_msg: Optional[str] = None
+    start_ns = time.monotonic_ns()
     
     try:
         # Ensure row limit is applied
         sql_final = ensure_limit(sql, dialect, row_cap)
         
-        # Refresh RLS token if required before execution
+        # Refresh RLS token if required before execution (updates it in place)
+        if refresh_rls:
+            refresh_rls_token(state)
         effective_rls_context = rls_context
-        if effective_rls_context and effective_rls_context.get("access_token"):
-            auto_refresh = effective_rls_context.get("auto_refresh")
-            if auto_refresh is None:
-                auto_refresh = effective_rls_context.get("autoRefresh")
-            if auto_refresh:
-                supabase_url = state["ctx"].get("supabase_url")
-                anon_key = state["ctx"].get("supabase_anon_key")
-                refresh_token = (
-                    effective_rls_context.get("refresh_token")
-                    or effective_rls_context.get("refreshToken")
-                )
-                if supabase_url and anon_key:
-                    manager: Optional[RLSTokenManager] = state["ctx"].get("_rls_token_manager")
-                    if manager is None:
-                        manager = RLSTokenManager(supabase_url=supabase_url, anon_key=anon_key)
-                        state["ctx"]["_rls_token_manager"] = manager
-                    new_access, new_refresh = manager.refresh_token_if_needed(
-                        effective_rls_context["access_token"],
-                        refresh_token,
-                    )
-                    if new_access != effective_rls_context["access_token"]:
-                        effective_rls_context["access_token"] = new_access
-                    if new_refresh and new_refresh != refresh_token:
-                        effective_rls_context["refresh_token"] = new_refresh
-                else:
-                    logger.warning(
-                        "RLS auto-refresh requested but configuration missing",
-                        has_supabase_url=bool(supabase_url),
-                        has_anon_key=bool(anon_key),
-                    )
-            # Update ctx reference to reflect any token changes
-            state["ctx"]["rls_context"] = effective_rls_context
-            state["rls_context"] = effective_rls_context
 
         # Execute query through connector, preferring RLS-aware code paths when available
-        if effective_rls_context and effective_rls_context.get("access_token"):
-            access_token = effective_rls_context["access_token"]
-            token_hash = hashlib.sha256(access_token.encode("utf-8")).hexdigest()
-            safe_claims: Optional[Dict[str, Any]] = None
-            try:
-                decoded_claims = jwt.get_unverified_claims(access_token)
-                safe_claims = {k: decoded_claims.get(k) for k in ("sub", "role", "aud", "iss", "exp")}
-            except Exception as decode_error:  # pragma: no cover - defensive logging
-                logger.warning(
-                    "Failed to decode RLS access token",
-                    job_id=state.get("job_id"),
-                    error=str(decode_error),
-                )
-            logger.info(
+        if (
+            effective_rls_context
+            and effective_rls_context.get("access_token")
+            and log_enabled_for(logging.INFO)
+        ):
+            token_hash, safe_claims = _describe_rls_token(effective_rls_context["access_token"])
+            log.info(
                 "Executing SQL with RLS context",
-                job_id=state.get("job_id"),
-                supabase_url=state["ctx"].get("supabase_url"),
-                supabase_project_ref=state["ctx"].get("supabase_project_ref"),
+                supabase_url=ctx.get("supabase_url"),
+                supabase_project_ref=ctx.get("supabase_project_ref"),
                 access_token_hash=token_hash,
                 rls_claims=safe_claims,
             )
 
-        rls_context_for_execution = state.get("rls_context")
+        # state["rls_context"] is rls_context itself (synced above)
+        rls_context_for_execution = rls_context
         if rls_context_for_execution and hasattr(connector, "run_sql_with_rls"):
             table = connector.run_sql_with_rls(
                 sql_final,
@@ -126,77 +370,39 @@ def try_execute_sql(
             )
         else:
             if rls_context_for_execution:
-                logger.debug(
+                log.debug(
                     "Connector lacks RLS execution hook; falling back to run_sql",
                     connector_type=type(connector).__name__
                 )
             table = connector.run_sql(sql_final, limit=row_cap)
         
-        duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
-        
-        # Update budget
-        consume_budget(state, queries=1, seconds=duration_ms / 1000)
-        
-        # Add execution step
-        add_execution_step(
-            state,
-            step_name="sql_execution",
-            status="completed",
-            duration_ms=duration_ms,
-            sql=sql_final,
-            row_count=table.num_rows
-        )
-        
-        logger.info(
-            "SQL execution successful",
-            rows=table.num_rows,
-            columns=table.num_columns,
-            duration_ms=duration_ms,
-            dialect=dialect
-        )
-        
-        return {
-            "ok": True,
-            "table": table,
-            "row_count": table.num_rows,
-            "column_count": table.num_columns,
-            "duration_ms": duration_ms,
-            "sql": sql_final
-        }
-        
     except Exception as e:
-        duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
         error_msg = str(e)[:2000]  # Truncate very long errors
         
-        # Still consume budget for failed queries
+    finally:
+        # Bookkeeping runs once for every outcome, including exceptions that
+        # escape (e.g. KeyboardInterrupt); failed queries still consume budget
+        duration_ms = (time.monotonic_ns() - start_ns) // 1_000_000
         consume_budget(state, queries=1, seconds=duration_ms / 1000)
-        
-        # Add execution step
+        failed = table is None
         add_execution_step(
             state,
             step_name="sql_execution",
-            status="failed",
+            status="failed" if failed else "completed",
             duration_ms=duration_ms,
-            sql=sql,
+            sql=sql if failed else sql_final,
+            row_count=None if failed else table.num_rows,
             error=error_msg
         )
-        
+    
+    if failed:
         # Track error in state
-        if "errors" not in state:
-            state["errors"] = []
+        record_error(state, error_msg, sql=sql, duration_ms=duration_ms)
         
-        state["errors"].append({
-            "sql": sql,
-            "error": error_msg,
-            "timestamp": time.time(),
-            "duration_ms": duration_ms
-        })
-        
-        logger.error(
+        log.error(
             "SQL execution failed",
             error=error_msg,
             duration_ms=duration_ms,
-            dialect=dialect,
             sql_preview=sql[:200] + "..." if len(sql) > 200 else sql
         )
         
@@ -206,12 +412,68 @@ def try_execute_sql(
             "duration_ms": duration_ms,
             "sql": sql
         }
+    
+    log.info(
+        "SQL execution successful",
+        rows=table.num_rows,
+        columns=table.num_columns,
+        duration_ms=duration_ms
+    )
+    
+    return {
+        "ok": True,
+        "table": table,
+        "row_count": table.num_rows,
+        "column_count": table.num_columns,
+        "duration_ms": duration_ms,
+        "sql": sql_final
+    }
 
 
+# Case-insensitive keyword checks for ensure_limit, matched in place rather
+# than against an upper-cased copy of the query
+_LIMIT_RE = re.compile(r"\b(?:LIMIT|TOP|FETCH\s+(?:FIRST|NEXT))\b", re.IGNORECASE)
+# T-SQL puts TOP after SELECT and any DISTINCT/ALL quantifier
+_SELECT_RE = re.compile(r"^\s*SELECT(?:\s+(?:DISTINCT|ALL))?\b", re.IGNORECASE)
+
+# Row limits almost always close the query; check this many trailing
+# characters before scanning the whole statement
+_LIMIT_TAIL_CHARS = 64
+
+
+def _apply_top(sql: str, row_cap: int) -> str:
+    """Insert ``TOP n`` after the leading SELECT (SQL Server)."""
+    select = _SELECT_RE.match(sql)
+    if select is None:
+        return sql
+    return f"{sql[:select.end()]} TOP {row_cap}{sql[select.end():]}"
+
+
+def _apply_limit_suffix(sql: str, row_cap: int) -> str:
+    """Append ``LIMIT n``, dropping any trailing semicolon."""
+    return f"{sql.rstrip().rstrip(';')} LIMIT {row_cap}"
+
+
+def _apply_fetch_first(sql: str, row_cap: int) -> str:
+    """Append ``FETCH FIRST n ROWS ONLY``, dropping any trailing semicolon."""
+    return f"{sql.rstrip().rstrip(';')} FETCH FIRST {row_cap} ROWS ONLY"
+
+
+# Row-limit syntax per dialect; anything not listed takes a LIMIT suffix
+_LIMIT_APPLIERS: Mapping[str, Callable[[str, int], str]] = MappingProxyType({
+    "mssql": _apply_top,
+    "oracle": _apply_fetch_first,
+})
+
+
+@lru_cache(maxsize=1024)
 def ensure_limit(sql: str, dialect: str, row_cap: int) -> str:
     """
     Ensure SQL query has appropriate LIMIT clause.
     
+    Pure in its arguments, so results are memoized: refinement loops and
+    repeated diagnostics re-submit identical statements.
+    
     Args:
         sql: SQL query
         dialect: SQL dialect
@@ -220,22 +482,36 @@ def ensure_limit(sql: str, dialect: str, row_cap: int) -> str:
     Returns:
         SQL with limit clause applied
     """
-    sql_upper = sql.upper()
-    
-    # Skip if already has LIMIT or TOP
-    if "LIMIT" in sql_upper or "TOP" in sql_upper:
+    # Skip if already has LIMIT, TOP or FETCH FIRST/NEXT
+    if _LIMIT_RE.search(sql, max(len(sql) - _LIMIT_TAIL_CHARS, 0)) or _LIMIT_RE.search(sql):
         return sql
     
     # Apply dialect-specific limiting
-    if dialect == "mssql":
-        # SQL Server uses TOP after SELECT
-        if sql.strip().upper().startswith("SELECT"):
-            return sql.replace("SELECT", f"SELECT TOP {row_cap}", 1)
-    else:
-        # Most databases use LIMIT at the end
-        return f"{sql.rstrip(';')} LIMIT {row_cap}"
+    return _LIMIT_APPLIERS.get(dialect, _apply_limit_suffix)(sql, row_cap)
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def dedupe_sqls(sqls: List[str]) -> List[str]:
+    """
+    Drop statements that repeat an earlier one, keeping first occurrences.
+    
+    Statements are compared case-insensitively, with runs of whitespace
+    collapsed and any trailing semicolon ignored, so an LLM re-emitting the
+    same probe with different formatting costs one execution, not two.
     
-    return sql
+    Args:
+        sqls: SQL statements in execution order
+        
+    Returns:
+        The distinct statements, in their original order
+    """
+    unique: Dict[str, str] = {}
+    for sql in sqls:
+        normalized = _WHITESPACE_RE.sub(" ", sql.strip().rstrip(";").rstrip()).lower()
+        unique.setdefault(normalized, sql)
+    return list(unique.values())
 
 
 def llm_generate_sql(prompt: str, model: Optional[str] = None) -> Dict[str, Any]:
@@ -249,52 +525,43 @@ def llm_generate_sql(prompt: str, model: Optional[str] = None) -> Dict[str, Any]
     Returns:
         Dictionary with sql and notes
     """
+    chosen_model = model or settings.default_llm_model
+    log = logger.bind(model=chosen_model)
+    
     try:
-        chosen_model = model or settings.default_llm_model
+        cache_key = _llm_cache_key("sql", chosen_model, prompt)
+        cached = _llm_cache_get(cache_key)
+        if cached is not None:
+            log.debug("Reusing cached SQL generation")
+            return cached
+        
         llm = create_llm(model=chosen_model, temperature=settings.llm_temperature)
-        response = llm.invoke(prompt)
+        content = _stream_json_reply(llm, prompt)
         
         # Parse JSON response
-        content = response.content.strip()
-        
-        # Handle potential markdown code blocks
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.endswith("```"):
-            content = content[:-3]
-        
-        result = json.loads(content)
+        result = orjson.loads(content)
+        _llm_cache_put(cache_key, result)
         
-        logger.debug(
+        log.debug(
             "Generated SQL",
-            model=chosen_model,
             has_sql=bool(result.get("sql")),
             notes=result.get("notes", "")[:100]
         )
         
         return result
         
-    except json.JSONDecodeError as e:
-        logger.error("Failed to parse LLM JSON response", error=str(e), content=content[:500])
+    except orjson.JSONDecodeError as e:
+        log.error("Failed to parse LLM JSON response", error=str(e), content=content[:500])
         # Fallback: try to extract SQL from response
-        lines = content.split('\n')
-        sql_lines = []
-        in_sql = False
-        
-        for line in lines:
-            if 'SELECT' in line.upper() or in_sql:
-                in_sql = True
-                sql_lines.append(line)
-                if line.strip().endswith(';'):
-                    break
+        match = _FALLBACK_SQL_RE.search(content)
         
         return {
-            "sql": "\n".join(sql_lines) if sql_lines else "SELECT 1",
+            "sql": match.group(0) if match else "SELECT 1",
             "notes": "Generated from unparseable response"
         }
         
     except Exception as e:
-        logger.error("LLM SQL generation failed", error=str(e))
+        log.error("LLM SQL generation failed", error=str(e))
         return {
             "sql": "SELECT 1 -- Error generating SQL",
             "notes": f"Error: {str(e)}"
@@ -312,24 +579,24 @@ def llm_generate_diagnostics(prompt: str, model: Optional[str] = None) -> Dict[s
     Returns:
         Dictionary with diagnostic_sqls and purpose
     """
+    chosen_model = model or settings.default_llm_model
+    log = logger.bind(model=chosen_model)
+    
     try:
-        chosen_model = model or settings.default_llm_model
-        llm = create_llm(model=chosen_model, temperature=settings.llm_temperature)
-        response = llm.invoke(prompt)
+        cache_key = _llm_cache_key("diagnostics", chosen_model, prompt)
+        cached = _llm_cache_get(cache_key)
+        if cached is not None:
+            log.debug("Reusing cached diagnostics generation")
+            return cached
         
-        content = response.content.strip()
-        
-        # Handle markdown code blocks
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.endswith("```"):
-            content = content[:-3]
+        llm = create_llm(model=chosen_model, temperature=settings.llm_temperature)
+        content = _stream_json_reply(llm, prompt)
         
-        result = json.loads(content)
+        result = orjson.loads(content)
+        _llm_cache_put(cache_key, result)
         
-        logger.debug(
+        log.debug(
             "Generated diagnostics",
-            model=chosen_model,
             num_queries=len(result.get("diagnostic_sqls", [])),
             purpose=result.get("purpose", "")[:100]
         )
@@ -337,7 +604,7 @@ def llm_generate_diagnostics(prompt: str, model: Optional[str] = None) -> Dict[s
         return result
         
     except Exception as e:
-        logger.error("LLM diagnostic generation failed", error=str(e))
+        log.error("LLM diagnostic generation failed", error=str(e))
         return {
             "diagnostic_sqls": [
                 "SELECT COUNT(*) as row_count FROM information_schema.tables",
@@ -346,13 +613,82 @@ def llm_generate_diagnostics(prompt: str, model: Optional[str] = None) -> Dict[s
             "purpose": f"Fallback diagnostics due to error: {str(e)}"
         }
 
+# Lexical table prefilter: identifier-like words in the question, and the
+# words of a table name once split on underscores/digits and camelCase humps
+_QUESTION_WORD_RE = re.compile(r"[a-z_][a-z0-9_]{2,}")
+_NAME_WORD_RE = re.compile(r"[a-z]+")
+_CAMEL_HUMP_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def _singular(word: str) -> str:
+    """Crude plural folding so "orders" in a question matches table ``order``."""
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def _tables_named_in_question(question: str, tables: List[str]) -> List[str]:
+    """
+    Return tables whose every name part appears as a word in the question.
+    
+    Both sides are lowercased and plural-folded, so ``order_items``,
+    ``OrderItems`` and "order items" all match one another. Names with no
+    alphabetic part never match.
+    """
+    question_words = frozenset(
+        _singular(part)
+        for word in _QUESTION_WORD_RE.findall(question.lower())
+        for part in (word, *word.split("_"))
+        if part
+    )
+    named = []
+    for table in tables:
+        parts = _NAME_WORD_RE.findall(_CAMEL_HUMP_RE.sub("_", table).lower())
+        if parts and all(_singular(part) in question_words for part in parts):
+            named.append(table)
+    return named
+
+
+def _candidate_table_names(question: str) -> Set[str]:
+    """
+    Lowercase table names the question could be naming, for a catalogue lookup.
+    
+    Covers single words and adjacent word pairs (joined with and without an
+    underscore), each with its plural folded either way. Candidates are a
+    superset filter only; ``_tables_named_in_question`` makes the final call.
+    """
+    words = [
+        part
+        for word in _QUESTION_WORD_RE.findall(question.lower())
+        for part in word.split("_")
+        if part
+    ]
+    forms = [{word, _singular(word), _singular(word) + "s"} for word in words]
+    candidates = set()
+    for i, first in enumerate(forms):
+        candidates.update(first)
+        if i + 1 < len(forms):
+            for a in first:
+                for b in forms[i + 1]:
+                    candidates.add(a + "_" + b)
+                    candidates.add(a + b)
+    return candidates
+
+
 def select_relevant_tables(
     state: AnalystState,
     tables: List[str],
     max_candidates: int = 12,
-    prompt_table_limit: int = 200
+    prompt_table_limit: int = _PROMPT_TABLE_LIMIT,
+    catalogue_matches: Optional[List[str]] = None
 ) -> Dict[str, Any]:
-    """Use the LLM to select tables most relevant to the current question."""
+    """
+    Select tables most relevant to the current question.
+    
+    Tables the question names outright are returned without consulting the
+    LLM; otherwise the LLM picks from the (sorted, truncated) table list.
+    ``catalogue_matches`` are tables found by a name lookup against the full
+    catalogue when ``tables`` is a truncated listing, so the prefilter can
+    still select tables past the listing's cut-off.
+    """
     if not tables:
         return {"tables": [], "notes": "No tables available", "method": "empty"}
 
@@ -369,23 +705,36 @@ def select_relevant_tables(
             "method": "fallback",
         }
 
-    shown_tables = tables[:prompt_table_limit]
+    # A question that names its tables outright needs no LLM round-trip
+    named_tables = _tables_named_in_question(
+        question, tables if catalogue_matches is None else catalogue_matches
+    )
+    if 0 < len(named_tables) <= max_candidates:
+        logger.debug(
+            "Selected tables named in the question",
+            selected_count=len(named_tables),
+            total_available=len(tables)
+        )
+        return {
+            "tables": named_tables,
+            "notes": "Tables named in the question",
+            "method": "regex_prefilter",
+        }
+
+    # Everything that only depends on the schema goes first (tables sorted so
+    # the listing is deterministic), and the question last, so questions
+    # against the same database share a long prompt prefix that providers
+    # can serve from their prompt caches
+    shown_tables = sorted(tables)[:prompt_table_limit]
     truncated = len(tables) > prompt_table_limit
-    table_list = "\\n".join(f"- {name}" for name in shown_tables)
+    table_list = "\n".join("- " + name for name in shown_tables)
 
     prompt = f"""You are a senior data analyst preparing to write SQL for a business question.
 
-QUESTION:
-{question}
-
-AVAILABLE TABLES (showing {len(shown_tables)} of {len(tables)} total):
+AVAILABLE TABLES:
 {table_list}
-"""
-    if truncated:
-        prompt += "\\nAdditional tables exist beyond this list; if you are unsure include a note in your response.\\n"
 
-    prompt += f"""
-Select up to {max_candidates} tables that are most relevant for answering the question.
+Select up to {max_candidates} tables that are most relevant for answering the question given at the end.
 Return a JSON object with exactly this structure:
 {{
     "tables": ["table_a", "table_b"],
@@ -396,21 +745,27 @@ Rules:
 - Only return names that appear in the provided table list.
 - Prefer the smallest set of tables needed to answer the question.
 - If unsure, include your uncertainty in the notes.
+
+The table list shows {len(shown_tables)} tables.
+"""
+    if truncated:
+        prompt += "Additional tables exist beyond this list; if you are unsure include a note in your response.\n"
+
+    prompt += f"""
+QUESTION:
+{question}
 """
 
     try:
-        llm = create_llm(
-            model=settings.default_llm_model,
-            temperature=settings.llm_temperature
-        )
-        response = llm.invoke(prompt)
-        content = response.content.strip()
-        if content.startswith('```json'):
-            content = content[7:]
-        if content.endswith('```'):
-            content = content[:-3]
-
-        result = json.loads(content)
+        cache_key = _llm_cache_key("tables", settings.default_llm_model, prompt)
+        result = _llm_cache_get(cache_key)
+        if result is None:
+            llm = create_llm(
+                model=settings.default_llm_model,
+                temperature=settings.llm_temperature
+            )
+            result = orjson.loads(_stream_json_reply(llm, prompt))
+            _llm_cache_put(cache_key, result)
         raw_tables = result.get('tables', []) or []
         selected = []
         for name in raw_tables:
@@ -444,6 +799,91 @@ Rules:
 
 
 
+def _arrow_ipc_bytes(table: pa.Table) -> bytes:
+    """Serialize an Arrow table as an Arrow IPC stream."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# Tables at or above this many rows get no sample rows in the schema card
+_SAMPLE_MAX_ROWS = 1000
+
+
+def _submit_table_profile(executor: Executor, connector: Any, table: str) -> Dict[str, Future]:
+    """
+    Start every metadata read needed to profile a table.
+    
+    The calls are independent round-trips, so they are issued together. The
+    sample read is speculative: it only matters for tables under
+    ``_SAMPLE_MAX_ROWS`` rows, which is not known until the count returns.
+    """
+    futures = {
+        "columns": executor.submit(connector.get_columns, table),
+        "profile": executor.submit(connector.profile_counts, table),
+        "sample": executor.submit(connector.read_table, table, limit=5),
+    }
+    constraints_fn = getattr(connector, "get_constraints", None)
+    if callable(constraints_fn):
+        futures["constraints"] = executor.submit(constraints_fn, table)
+    return futures
+
+
+def _profile_table(table: str, futures: Dict[str, Future]) -> Optional[Dict[str, Any]]:
+    """
+    Assemble a single table's schema card entry from its metadata reads.
+
+    Args:
+        table: Table name
+        futures: Pending reads from ``_submit_table_profile``
+
+    Returns:
+        Columns, row count, sample rows (as Arrow IPC stream bytes) and
+        constraints, or None if the table could not be profiled
+    """
+    try:
+        columns = futures["columns"].result()
+        profile = futures["profile"].result()
+        if "constraints" in futures:
+            constraints = futures["constraints"].result()
+        else:
+            constraints = {
+                "primary_key": {"name": None, "columns": []},
+                "foreign_keys": [],
+                "unique_constraints": [],
+                "check_constraints": [],
+            }
+
+        sample_rows_ipc = None
+        if profile.get("total_rows", 0) < _SAMPLE_MAX_ROWS:
+            try:
+                sample_table = futures["sample"].result().slice(0, 3)
+                sample_rows_ipc = _arrow_ipc_bytes(sample_table)
+            except Exception:
+                pass  # Sample data is optional
+        else:
+            futures["sample"].cancel()  # Unneeded; skip it if not yet started
+
+        logger.debug(
+            "Profiled table",
+            table=table,
+            columns=len(columns),
+            rows=profile.get("total_rows", 0)
+        )
+
+        return {
+            "columns": columns,
+            "row_count": profile.get("total_rows", 0),
+            "sample_rows_ipc": sample_rows_ipc,
+            "constraints": constraints,
+        }
+
+    except Exception as e:
+        logger.warning("Failed to profile table", table=table, error=str(e))
+        return None
+
+
 def generate_schema_card(state: AnalystState) -> Dict[str, Any]:
     """
     Generate a schema card by profiling the database.
@@ -455,13 +895,36 @@ def generate_schema_card(state: AnalystState) -> Dict[str, Any]:
         Schema card with table and column information
     """
     connector = state["ctx"]["connector"]
+    fingerprint = _connection_fingerprint(state)
 
     try:
         # List available tables and store for downstream nodes
-        tables = connector.list_tables()
+        listing = _schema_cache_get(fingerprint, None)
+        if listing is None:
+            tables = connector.list_tables(limit=_PROMPT_TABLE_LIMIT + 1)
+            total_tables = len(tables)
+            if total_tables > _PROMPT_TABLE_LIMIT:
+                count_tables_fn = getattr(connector, "count_tables", None)
+                counted = count_tables_fn() if callable(count_tables_fn) else None
+                total_tables = counted if counted is not None else total_tables
+            listing = {"tables": tables, "total": total_tables}
+            _schema_cache_put(fingerprint, None, listing)
+        tables = listing["tables"]
+        total_tables = listing["total"]
         state.setdefault("ctx", {})["available_tables"] = tables
 
-        selection = select_relevant_tables(state, tables)
+        # The listing is capped for the prompt; look the question's words up
+        # in the full catalogue so named tables past the cap are still found
+        catalogue_matches = None
+        if len(tables) > _PROMPT_TABLE_LIMIT:
+            question = state.get("spec", {}).get("question", "")
+            candidates = _candidate_table_names(question)
+            try:
+                catalogue_matches = connector.list_tables(names=candidates) if candidates else []
+            except Exception as e:  # Fall back to prefiltering the listing
+                logger.warning("Catalogue table lookup failed", error=str(e))
+
+        selection = select_relevant_tables(state, tables, catalogue_matches=catalogue_matches)
         selected_tables = selection.get("tables", [])
         if not selected_tables and tables:
             selected_tables = tables[:10]
@@ -472,62 +935,40 @@ def generate_schema_card(state: AnalystState) -> Dict[str, Any]:
             "tables": {},
             "generated_at": time.time(),
             "table_selection": {
-                "available_tables": len(tables),
+                "available_tables": total_tables,
                 "selected_tables": selected_tables,
                 "method": selection.get("method", "unknown"),
                 "notes": selection.get("notes", ""),
             },
         }
 
-        for table in selected_tables:
-            try:
-                columns = connector.get_columns(table)
-                profile = connector.profile_counts(table)
-                constraints_fn = getattr(connector, "get_constraints", None)
-                if callable(constraints_fn):
-                    constraints = constraints_fn(table)
-                else:
-                    constraints = {
-                        "primary_key": {"name": None, "columns": []},
-                        "foreign_keys": [],
-                        "unique_constraints": [],
-                        "check_constraints": [],
-                    }
-
-                sample_rows = []
-                if profile.get("total_rows", 0) < 1000:
-                    try:
-                        sample_table = connector.read_table(table, limit=5)
-                        if sample_table.num_rows > 0:
-                            sample_df = sample_table.to_pandas()
-                            sample_rows = [
-                                dict(row) for _, row in sample_df.head(3).iterrows()
-                            ]
-                    except Exception:
-                        pass  # Sample data is optional
-
-                schema_card["tables"][table] = {
-                    "columns": columns,
-                    "row_count": profile.get("total_rows", 0),
-                    "sample_rows": sample_rows,
-                    "constraints": constraints,
-                }
-
-                logger.debug(
-                    "Profiled table",
-                    table=table,
-                    columns=len(columns),
-                    rows=profile.get("total_rows", 0)
-                )
-
-            except Exception as e:
-                logger.warning("Failed to profile table", table=table, error=str(e))
-                continue
+        # Profile uncached tables concurrently: every table's metadata reads
+        # are independent round-trips, and the connector's engine hands each
+        # thread its own pooled connection. All reads share one bounded pool
+        # (submitted table by table, so early tables finish first) and are
+        # assembled in selection order for the card.
+        profiles = {table: _schema_cache_get(fingerprint, table) for table in selected_tables}
+        missing = [table for table, profile in profiles.items() if profile is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=_PROFILE_WORKERS) as executor:
+                pending = [
+                    (table, _submit_table_profile(executor, connector, table))
+                    for table in missing
+                ]
+                for table, futures in pending:
+                    profile = _profile_table(table, futures)
+                    profiles[table] = profile
+                    if profile is not None:
+                        _schema_cache_put(fingerprint, table, profile)
+
+        schema_card["tables"] = {
+            table: profile for table, profile in profiles.items() if profile is not None
+        }
 
         logger.info(
             "Generated schema card",
             tables=len(schema_card["tables"]),
-            total_tables_available=len(tables),
+            total_tables_available=total_tables,
             selection_method=schema_card["table_selection"]["method"],
         )
 
@@ -5,8 +5,50 @@ Defines the state structure that flows through the analysis nodes,
 tracking query specification, execution context, results, and metadata.
 """
 
-from typing import TypedDict, List, Dict, Any, Optional
+from collections import deque
+from dataclasses import dataclass
+from typing import TypedDict, Deque, List, Dict, Any, Optional
 from datetime import datetime
+import threading
+import time
+
+# Serializes budget read-modify-writes from concurrently executing queries
+_budget_lock = threading.Lock()
+
+
+@dataclass(slots=True)
+class HistoryEntry:
+    """One SQL attempt recorded by the mvq/refine nodes."""
+    
+    stage: str
+    sql: str
+    ok: bool
+    row_count: int = 0
+    error: Optional[str] = None
+    timestamp: float = 0.0
+    notes: str = ""                         # Generation notes (mvq)
+    changes: Optional[str] = None           # What the refinement changed (refine)
+    score: float = 0.0
+    flag_weird: bool = False
+
+
+@dataclass(slots=True)
+class ErrorRecord:
+    """One failed SQL execution or refinement, kept in ``state["errors"]``."""
+    
+    sql: Optional[str]                      # Shared reference, not a copy
+    error: str
+    timestamp: float
+    duration_ms: Optional[float] = None
+
+
+# Only the most recent errors feed refinement prompts; older ones would just
+# pin long messages in memory and bloat checkpoints on long retry loops
+MAX_ERROR_RECORDS = 64
+
+# Routing, plateau detection and presentation only read the latest history
+# entries, so history is bounded the same way
+MAX_HISTORY_ENTRIES = 200
 
 
 class AnalystState(TypedDict, total=False):
@@ -23,7 +65,7 @@ class AnalystState(TypedDict, total=False):
     
     # Data and results
     rs: Dict[str, Any]                      # Raw SQL results and metadata
-    shaped: Dict[str, Any]                  # Transformed/shaped data frames
+    shaped: Dict[str, Any]                  # Transformed/shaped result tables
     artifacts: List[Dict[str, Any]]         # Generated artifacts (tables, charts, etc.)
     
     # Quality and validation
@@ -31,13 +73,14 @@ class AnalystState(TypedDict, total=False):
     validation_results: List[Dict[str, Any]]   # Individual validation checks
     
     # Execution tracking
-    history: List[Dict[str, Any]]           # Execution history and step results
+    history: Deque[HistoryEntry]            # Recent execution history (bounded)
     attempt: int                            # Current attempt number
+    max_attempts: int                       # Attempt cap derived once from the query budget
     budget_remaining: Dict[str, int]        # Remaining budget (queries, time)
     
     # Diagnostics and debugging
     diagnostics: List[Dict[str, Any]]       # Diagnostic query results
-    errors: List[Dict[str, Any]]            # Error history
+    errors: Deque[ErrorRecord]              # Recent error history (bounded)
 
     # RLS authentication context
     rls_context: Dict[str, Any]             # Supabase/SaaS specific auth context
@@ -53,6 +96,11 @@ class AnalystState(TypedDict, total=False):
     updated_at: datetime                    # Last update timestamp
 
 
+def max_attempts_for_budget(budget: Dict[str, Any]) -> int:
+    """Attempt cap for a query budget: ~20% of the allowed queries."""
+    return budget.get("queries", 30) // 5
+
+
 def create_initial_state(
     job_id: str,
     spec: Dict[str, Any],
@@ -78,6 +126,8 @@ def create_initial_state(
     if rls_context is not None:
         ctx_with_rls["rls_context"] = rls_context
     
+    budget = spec.get("budget", {"queries": 30, "seconds": 90})
+    
     state = AnalystState(
         job_id=job_id,
         spec=spec,
@@ -87,11 +137,13 @@ def create_initial_state(
         artifacts=[],
         quality={},
         validation_results=[],
-        history=[],
+        history=deque(maxlen=MAX_HISTORY_ENTRIES),
         attempt=0,
-        budget_remaining=spec.get("budget", {"queries": 30, "seconds": 90}).copy(),
+        # Spec is fixed for the job, so routing reads this instead of re-deriving it
+        max_attempts=max_attempts_for_budget(budget),
+        budget_remaining=budget.copy(),
         diagnostics=[],
-        errors=[],
+        errors=deque(maxlen=MAX_ERROR_RECORDS),
         answer=None,
         execution_steps=[],
         lineage={},
@@ -172,17 +224,18 @@ def consume_budget(
     Returns:
         Updated state
     """
-    if "budget_remaining" not in state:
-        state["budget_remaining"] = {"queries": 30, "seconds": 90}
-    
-    state["budget_remaining"]["queries"] = max(
-        0, 
-        state["budget_remaining"]["queries"] - queries
-    )
-    state["budget_remaining"]["seconds"] = max(
-        0,
-        state["budget_remaining"]["seconds"] - int(seconds)
-    )
+    with _budget_lock:
+        if "budget_remaining" not in state:
+            state["budget_remaining"] = {"queries": 30, "seconds": 90}
+        
+        state["budget_remaining"]["queries"] = max(
+            0, 
+            state["budget_remaining"]["queries"] - queries
+        )
+        state["budget_remaining"]["seconds"] = max(
+            0,
+            state["budget_remaining"]["seconds"] - int(seconds)
+        )
     
     return update_state_timestamp(state)
 
@@ -217,8 +270,8 @@ def get_last_sql(state: AnalystState) -> Optional[str]:
     
     # Look for SQL in reverse chronological order
     for entry in reversed(history):
-        if entry.get("sql"):
-            return entry["sql"]
+        if entry.sql:
+            return entry.sql
     
     return None
 
@@ -237,7 +290,33 @@ def get_last_error(state: AnalystState) -> Optional[str]:
     if not errors:
         return None
     
-    return errors[-1].get("error")
+    return errors[-1].error
+
+
+def record_error(
+    state: AnalystState,
+    error: str,
+    sql: Optional[str] = None,
+    duration_ms: Optional[float] = None
+) -> AnalystState:
+    """
+    Record an error in the state's bounded error history.
+    
+    Args:
+        state: Current state
+        error: Error message
+        sql: SQL that failed, if any
+        duration_ms: Time spent before the failure
+        
+    Returns:
+        Updated state
+    """
+    errors = state.get("errors")
+    if errors is None:
+        errors = state["errors"] = deque(maxlen=MAX_ERROR_RECORDS)
+    errors.append(ErrorRecord(sql=sql, error=error, timestamp=time.time(), duration_ms=duration_ms))
+    
+    return state
 
 
 def add_artifact(
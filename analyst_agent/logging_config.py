@@ -0,0 +1,125 @@
+"""
+Logging configuration for the Analyst Agent service.
+
+structlog events are handed to the standard library through a queue: the
+calling thread (usually the event loop) only builds the event dict, while
+rendering to JSON/text and writing to stdout happen on a background
+``QueueListener`` thread.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+
+import structlog
+
+from analyst_agent.settings import settings
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Minimum level structlog emits; NOTSET until ``configure_logging`` runs,
+# matching structlog's unconfigured default of printing everything
+_min_level = logging.NOTSET
+
+
+def log_enabled_for(level: int) -> bool:
+    """Return True if structlog events at ``level`` are emitted.
+
+    For guarding log calls whose fields are expensive to compute; plain
+    calls below the level are already no-ops.
+    """
+    return level >= _min_level
+
+
+class _EventDictQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues records untouched.
+
+    The stock ``prepare`` formats the message in the calling thread, which
+    would both defeat the purpose of the queue and flatten structlog's event
+    dict before ``ProcessorFormatter`` sees it. The queue never leaves the
+    process, so the record can be passed through as-is.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _capture_exc_info(
+    logger: logging.Logger, method_name: str, event_dict: structlog.typing.EventDict
+) -> structlog.typing.EventDict:
+    """Resolve ``exc_info=True`` while still in the thread handling the exception.
+
+    Traceback formatting is deferred to the listener thread, where
+    ``sys.exc_info()`` would no longer refer to the caller's exception.
+    """
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+def configure_logging() -> None:
+    """
+    Route structlog through a queue-backed stdlib handler (idempotent).
+
+    Honours ``settings.log_level`` and ``settings.log_format`` ("json" or
+    "text").
+    """
+    global _listener, _min_level
+
+    if _listener is not None:
+        return
+
+    if settings.log_format == "json":
+        renderer = structlog.processors.JSONRenderer()
+    else:
+        renderer = structlog.dev.ConsoleRenderer()
+
+    # Runs on the listener thread
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        structlog.stdlib.ProcessorFormatter(
+            processors=[
+                structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                structlog.processors.format_exc_info,
+                renderer,
+            ],
+            foreign_pre_chain=[
+                structlog.stdlib.add_log_level,
+                structlog.stdlib.add_logger_name,
+                structlog.processors.TimeStamper(fmt="iso"),
+            ],
+        )
+    )
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    root = logging.getLogger()
+    root.handlers = [_EventDictQueueHandler(log_queue)]
+    root.setLevel(settings.log_level)
+
+    _min_level = logging.getLevelName(settings.log_level)
+
+    # Runs on the calling thread; keep it to cheap dict updates. The filtering
+    # wrapper turns calls below the configured level into no-ops before any
+    # event dict is built or processor runs.
+    structlog.configure(
+        processors=[
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.processors.TimeStamper(fmt="iso"),
+            _capture_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.make_filtering_bound_logger(_min_level),
+        cache_logger_on_first_use=True,
+    )
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    # Drain queued records on interpreter exit
+    atexit.register(_listener.stop)
@@ -165,6 +165,10 @@ class JobStatusResponse(BaseModel):
     estimated_completion: Optional[datetime] = Field(None, description="Estimated completion time")
     result: Optional[RunResult] = Field(None, description="Final result if completed")
     error: Optional[str] = Field(None, description="Error message if failed")
+    retry_after_ms: Optional[int] = Field(
+        None,
+        description="Suggested delay before polling this job again (unset once the job is finished)"
+    )
 
 
 # Validators
@@ -191,6 +191,7 @@ class HealthCheck(BaseModel):
     version: str
     uptime_seconds: float
     dependencies: Dict[str, str] = {}  # dependency_name -> status
+    analysis_queue: Dict[str, int] = {}  # running / waiting analysis counts
 
 
 class ErrorResponse(BaseModel):
@@ -67,6 +67,16 @@ class Settings(BaseSettings):
         default=10,
         description="Database connection pool size"
     )
+    redis_url: Optional[str] = Field(
+        default=None,
+        description="Redis URL for shared job storage (in-memory store when unset)",
+        validation_alias=AliasChoices("REDIS_URL", "redis_url"),
+    )
+    use_job_queue: bool = Field(
+        default=False,
+        description="Enqueue background analyses on the ARQ worker queue (requires redis_url)",
+        validation_alias=AliasChoices("USE_JOB_QUEUE", "use_job_queue"),
+    )
     
     # LLM Provider settings
     openai_api_key: Optional[str] = Field(
@@ -91,6 +101,16 @@ class Settings(BaseSettings):
         description="Default LLM temperature (0.0-1.0)",
         validation_alias=AliasChoices("LLM_TEMPERATURE", "TEMPERATURE", "llm_temperature"),
     )
+    llm_cache_ttl_seconds: int = Field(
+        default=600,
+        description="Seconds to reuse an LLM generation for an identical prompt (0 disables the cache; also off when llm_temperature > 0.1)",
+        validation_alias=AliasChoices("LLM_CACHE_TTL_SECONDS", "llm_cache_ttl_seconds"),
+    )
+    llm_cache_max_entries: int = Field(
+        default=1024,
+        description="Maximum number of LLM generations kept in the prompt cache",
+        validation_alias=AliasChoices("LLM_CACHE_MAX_ENTRIES", "llm_cache_max_entries"),
+    )
 
     # LangSmith settings
     langsmith_tracing: bool = Field(
@@ -127,6 +147,31 @@ class Settings(BaseSettings):
         default=True,
         description="Enable safe code execution for analysis"
     )
+    job_ttl_seconds: int = Field(
+        default=3600,
+        description="Seconds to retain finished jobs before evicting them from the job store",
+        validation_alias=AliasChoices("JOB_TTL_SECONDS", "job_ttl_seconds"),
+    )
+    max_jobs: int = Field(
+        default=10_000,
+        description="Maximum number of jobs kept by the in-memory job store",
+        validation_alias=AliasChoices("MAX_JOBS", "max_jobs"),
+    )
+    max_concurrent_analyses: int = Field(
+        default=8,
+        description="Maximum analyses run concurrently per process; further jobs wait their turn",
+        validation_alias=AliasChoices("MAX_CONCURRENT_ANALYSES", "max_concurrent_analyses"),
+    )
+    artifact_inline_max_rows: int = Field(
+        default=10_000,
+        description="Largest result inlined as JSON records in table artifacts; bigger results are shipped as base64 Arrow IPC with a truncated sample in data",
+        validation_alias=AliasChoices("ARTIFACT_INLINE_MAX_ROWS", "artifact_inline_max_rows"),
+    )
+    schema_cache_ttl_seconds: int = Field(
+        default=300,
+        description="Seconds to reuse table listings and per-table profiles for schema cards (0 disables the cache)",
+        validation_alias=AliasChoices("SCHEMA_CACHE_TTL_SECONDS", "schema_cache_ttl_seconds"),
+    )
     
     # LangGraph / workflow settings
     graph_recursion_limit: int = Field(
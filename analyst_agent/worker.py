@@ -0,0 +1,73 @@
+"""
+ARQ worker entry point for running analysis jobs off the API process.
+
+Start workers with:
+
+    arq analyst_agent.worker.WorkerSettings
+
+Job status is written to the shared Redis job store, so any API worker can
+serve ``/jobs/{job_id}`` and ``/stream/{job_id}`` for queued jobs.
+"""
+
+from typing import Any, Dict
+
+import structlog
+
+from analyst_agent.api.job_queue import redis_settings
+from analyst_agent.api.job_store import get_job_store
+from analyst_agent.api.routes.analysis import process_analysis_job
+from analyst_agent.logging_config import configure_logging
+from analyst_agent.models.contracts import DataSource, QuerySpec
+from analyst_agent.settings import settings
+
+configure_logging()
+logger = structlog.get_logger(__name__)
+
+JOB_TIMEOUT_HEADROOM_SECONDS = 60
+
+
+async def run_analysis_job(
+    ctx: Dict[str, Any],
+    job_id: str,
+    spec: Dict[str, Any],
+    data_source: Dict[str, Any]
+) -> None:
+    """
+    ARQ task wrapping ``process_analysis_job``.
+    
+    Args:
+        ctx: ARQ job context
+        job_id: Unique job identifier
+        spec: JSON-mode dump of the QuerySpec
+        data_source: JSON-mode dump of the DataSource
+    """
+    logger.info("Worker picked up analysis job", job_id=job_id, attempt=ctx.get("job_try"))
+    await process_analysis_job(
+        job_id,
+        QuerySpec.model_validate(spec),
+        DataSource.model_validate(data_source)
+    )
+
+
+async def shutdown(ctx: Dict[str, Any]) -> None:
+    """Release job store connections when the worker stops."""
+    await get_job_store().close()
+
+
+def _functions() -> list:
+    from arq import func
+
+    return [func(run_analysis_job, name="process_analysis_job")]
+
+
+class WorkerSettings:
+    """ARQ worker configuration."""
+    
+    functions = _functions()
+    redis_settings = redis_settings()
+    on_shutdown = shutdown
+    # Leave headroom over the graph's own budget so it can fail the job
+    # cleanly before ARQ cancels it
+    job_timeout = settings.max_execution_time + JOB_TIMEOUT_HEADROOM_SECONDS
+    # A restarted worker re-runs jobs it didn't finish
+    max_tries = 2
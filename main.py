@@ -5,12 +5,14 @@ This module provides the application entry point for ASGI servers like uvicorn.
 """
 
 import uvicorn
-from analyst_agent.api.app import app
+
 from analyst_agent.settings import settings
 
 
 def main() -> None:
     """Main entry point for the application."""
+    # The app is passed as an import string so it (and its routers) is built
+    # only once, inside the server process, rather than also here.
     uvicorn.run(
         "analyst_agent.api.app:app",
         host=settings.api_host,
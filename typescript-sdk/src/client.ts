@@ -213,12 +213,12 @@ export class AnalystClient {
   async waitForCompletion(
     jobId: string,
     options: {
-      pollInterval?: number;     // Polling interval in milliseconds
+      pollInterval?: number;     // Fixed polling interval in milliseconds (default: server-suggested)
       maxWaitTime?: number;      // Maximum wait time in milliseconds
       onProgress?: (status: JobStatusResponse) => void; // Progress callback
     } = {}
   ): Promise<RunResult> {
-    const pollInterval = options.pollInterval || 2000; // 2 seconds default
+    const defaultPollInterval = 2000; // 2 seconds if the server gives no hint
     const maxWaitTime = options.maxWaitTime || 300000; // 5 minutes default
     const startTime = Date.now();
 
@@ -249,7 +249,8 @@ export class AnalystClient {
         );
       }
 
-      await this.delay(pollInterval);
+      // Follow the server's adaptive backoff unless a fixed interval was requested
+      await this.delay(options.pollInterval ?? status.retry_after_ms ?? defaultPollInterval);
     }
 
     throw new AnalystApiError(
@@ -32,5 +32,6 @@ export type {
   QuerySpec,
   DataSource,
   SupabaseRLSAuth,
-  RunResult
+  RunResult,
+  TableArtifactContent
 } from './types';
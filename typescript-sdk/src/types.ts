@@ -55,10 +55,20 @@ export interface Artifact {
   kind: ArtifactType;              // Type of artifact
   title: string;                   // Human-readable title
   meta?: Record<string, any>;      // Artifact metadata
-  content?: Record<string, any>;   // Artifact content/data
+  content?: Record<string, any>;   // Artifact content/data (TableArtifactContent for tables)
   file_path?: string;              // Path to artifact file if stored separately
 }
 
+export interface TableArtifactContent {
+  format: "records" | "arrow_ipc"; // How the full result is encoded
+  data: Record<string, any>[];     // All rows, or a sample when truncated
+  truncated: boolean;              // True when data holds only a sample
+  row_count: number;               // Total rows in the result
+  columns: string[];               // Column names in result order
+  data_arrow?: string;             // Full result as base64 Arrow IPC stream (arrow_ipc only)
+  summary?: Record<string, any>;   // Result summary statistics
+}
+
 export interface QualityGate {
   name: string;                    // Gate name
   passed: boolean;                 // Whether gate passed
@@ -107,6 +117,7 @@ export interface JobStatusResponse {
   estimated_completion?: string;   // Estimated completion time (ISO string)
   result?: RunResult;              // Final result if completed
   error?: string;                  // Error message if failed
+  retry_after_ms?: number;         // Server-suggested delay before the next poll
 }
 
 // Legacy compatibility types